@@ -1,6 +1,8 @@
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Set
+from collections import ChainMap
 from enum import Enum
+from types import MappingProxyType
+import asyncio
 import json
 from abc import ABC, abstractmethod
 
@@ -13,29 +15,70 @@ class NodeType(Enum):
     END = "end"
 
 
-@dataclass
+# Value -> member lookup table; cheaper than NodeType(value) in from_dict
+_NODETYPE_BY_VALUE = {member.value: member for member in NodeType}
+
+
+# Agent configuration schemas are static, so build them once and share the
+# read-only views instead of re-materializing the dicts on every call
+_CHAT_AGENT_SCHEMA = MappingProxyType({
+    "type": "object",
+    "properties": {
+        "model": {"type": "string", "default": "gpt-3.5-turbo"},
+        "temperature": {"type": "number", "default": 0.7},
+        "max_tokens": {"type": "integer", "default": 1000}
+    }
+})
+
+_RAG_AGENT_SCHEMA = MappingProxyType({
+    "type": "object",
+    "properties": {
+        "vector_db": {"type": "string", "default": "chroma"},
+        "embedding_model": {"type": "string", "default": "text-embedding-ada-002"},
+        "top_k": {"type": "integer", "default": 5}
+    }
+})
+
+
 class GraphNode:
-    """Represents a node in the agent execution graph"""
-    id: str
-    type: NodeType
-    name: str
-    description: Optional[str] = None
-    config: Dict[str, Any] = None
-    next_nodes: List[str] = None
-    
-    def __post_init__(self):
-        if self.config is None:
-            self.config = {}
-        if self.next_nodes is None:
-            self.next_nodes = []
+    """Represents a node in the agent execution graph.
+
+    Plain class with explicit __slots__ rather than dataclass(slots=True),
+    which needs Python 3.10 and this project supports 3.9. Slots drop the
+    per-instance __dict__ for what is the most numerous object in a graph.
+    """
+
+    __slots__ = ('id', 'type', 'name', 'description', 'config',
+                 'next_nodes', 'sequential')
+
+    def __init__(
+        self,
+        id: str,
+        type: NodeType,
+        name: str,
+        description: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        next_nodes: Optional[List[str]] = None,
+        sequential: bool = False,  # force this node into its own execution stage
+    ):
+        self.id = id
+        self.type = type
+        self.name = name
+        self.description = description
+        self.config = config if config is not None else {}
+        self.next_nodes = next_nodes if next_nodes is not None else []
+        self.sequential = sequential
 
 
 class BaseAgent(ABC):
     """Abstract base class for agents in the graph"""
     
-    def __init__(self, agent_id: str, config: Dict[str, Any]):
+    def __init__(self, agent_id: str, config: Dict[str, Any], http_client: Any = None):
         self.agent_id = agent_id
         self.config = config
+        # Shared connection pool (e.g. app.state.http) so provider calls
+        # reuse keep-alive connections instead of handshaking per request
+        self.http_client = http_client
     
     @abstractmethod
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -47,6 +90,14 @@ class BaseAgent(ABC):
         """Return JSON schema for agent configuration"""
         pass
 
+    async def execute_batch(self, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Execute the agent over many inputs concurrently.
+
+        Default implementation gathers per-item execute() calls; agents
+        backed by providers with native batch APIs should override this.
+        """
+        return list(await asyncio.gather(*[self.execute(x) for x in inputs]))
+
 
 class ChatAgent(BaseAgent):
     """Agent for handling chat interactions"""
@@ -60,14 +111,7 @@ class ChatAgent(BaseAgent):
         }
     
     def get_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "model": {"type": "string", "default": "gpt-3.5-turbo"},
-                "temperature": {"type": "number", "default": 0.7},
-                "max_tokens": {"type": "integer", "default": 1000}
-            }
-        }
+        return _CHAT_AGENT_SCHEMA
 
 
 class RAGAgent(BaseAgent):
@@ -83,14 +127,7 @@ class RAGAgent(BaseAgent):
         }
     
     def get_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "vector_db": {"type": "string", "default": "chroma"},
-                "embedding_model": {"type": "string", "default": "text-embedding-ada-002"},
-                "top_k": {"type": "integer", "default": 5}
-            }
-        }
+        return _RAG_AGENT_SCHEMA
 
 
 class AgentGraph:
@@ -100,66 +137,182 @@ class AgentGraph:
         self.nodes: Dict[str, GraphNode] = {}
         self.agents: Dict[str, BaseAgent] = {}
         self.start_node: Optional[str] = None
-    
+        self._stages: Optional[List[List[str]]] = None
+        self._predecessors: Optional[Dict[str, Set[str]]] = None
+        # Dense-integer views of the schedule for the execute hot loop
+        self._id_of_int: List[str] = []
+        self._stages_int: List[List[int]] = []
+        self._agents_by_stage: List[List[BaseAgent]] = []
+        self._version = 0
+        self._dict_cache: Optional[Dict[str, Any]] = None
+        self._dict_cache_version = -1
+
     def add_node(self, node: GraphNode) -> None:
         """Add a node to the graph"""
         self.nodes[node.id] = node
-    
+        self._invalidate_schedule()
+
     def add_agent(self, agent: BaseAgent) -> None:
         """Add an agent to the graph"""
         self.agents[agent.agent_id] = agent
-    
+        # The compiled schedule binds agent objects per stage
+        self._invalidate_schedule()
+
     def set_start_node(self, node_id: str) -> None:
         """Set the starting node for graph execution"""
         if node_id in self.nodes:
             self.start_node = node_id
+            self._invalidate_schedule()
         else:
             raise ValueError(f"Node {node_id} not found in graph")
-    
+
     def add_edge(self, from_node: str, to_node: str) -> None:
         """Add an edge between two nodes"""
         if from_node in self.nodes and to_node in self.nodes:
             self.nodes[from_node].next_nodes.append(to_node)
+            self._invalidate_schedule()
         else:
             raise ValueError("One or both nodes not found in graph")
-    
-    async def execute(self, initial_input: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the graph starting from the start node"""
+
+    def _invalidate_schedule(self) -> None:
+        """Drop the compiled schedule after a structural change"""
+        self._stages = None
+        self._predecessors = None
+        self._version += 1
+
+    def compile(self) -> List[List[str]]:
+        """Compile the graph into parallel execution stages.
+
+        Runs Kahn's algorithm once over the nodes reachable from the start
+        node, grouping independent nodes into stages that can be awaited
+        concurrently. Nodes marked `sequential` get their own stage.
+        """
         if not self.start_node:
             raise ValueError("No start node set for graph execution")
-        
-        current_node_id = self.start_node
-        execution_result = initial_input.copy()
-        execution_path = []
-        
-        while current_node_id:
-            if current_node_id not in self.nodes:
-                raise ValueError(f"Node {current_node_id} not found")
-            
-            node = self.nodes[current_node_id]
-            execution_path.append(current_node_id)
-            
-            if node.type == NodeType.AGENT and current_node_id in self.agents:
-                agent = self.agents[current_node_id]
-                result = await agent.execute(execution_result)
-                execution_result.update(result)
-            elif node.type == NodeType.END:
-                break
-            
-            # Simple next node selection (take first available)
-            if node.next_nodes:
-                current_node_id = node.next_nodes[0]
-            else:
-                break
-        
+
+        # Collect nodes reachable from the start node
+        reachable: Set[str] = set()
+        frontier = [self.start_node]
+        while frontier:
+            node_id = frontier.pop()
+            if node_id in reachable:
+                continue
+            if node_id not in self.nodes:
+                raise ValueError(f"Node {node_id} not found")
+            reachable.add(node_id)
+            frontier.extend(self.nodes[node_id].next_nodes)
+
+        # Structural invariants are proven here, once, so execute() can run
+        # the schedule without per-hop checks
+        if not any(self.nodes[node_id].type == NodeType.END for node_id in reachable):
+            raise ValueError("Graph has no reachable END node")
+
+        # Build predecessor sets (deduplicated edges)
+        predecessors: Dict[str, Set[str]] = {node_id: set() for node_id in reachable}
+        for node_id in reachable:
+            for next_id in set(self.nodes[node_id].next_nodes):
+                predecessors[next_id].add(node_id)
+
+        # Kahn's algorithm, layered into stages
+        in_degree = {node_id: len(preds) for node_id, preds in predecessors.items()}
+        ready = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        stages: List[List[str]] = []
+        scheduled = 0
+
+        while ready:
+            parallel = [nid for nid in ready if not self.nodes[nid].sequential]
+            serial = [nid for nid in ready if self.nodes[nid].sequential]
+            if parallel:
+                stages.append(parallel)
+            stages.extend([nid] for nid in serial)
+            scheduled += len(ready)
+
+            next_ready = []
+            for node_id in ready:
+                for next_id in set(self.nodes[node_id].next_nodes):
+                    in_degree[next_id] -= 1
+                    if in_degree[next_id] == 0:
+                        next_ready.append(next_id)
+            ready = next_ready
+
+        if scheduled != len(reachable):
+            raise ValueError("Graph contains a cycle; cannot compile execution stages")
+
+        self._predecessors = predecessors
+        self._stages = stages
+
+        # Build dense-integer views so execute() indexes lists instead of
+        # hashing node-id strings on every hop
+        self._id_of_int = [node_id for stage in stages for node_id in stage]
+        int_of_id = {node_id: i for i, node_id in enumerate(self._id_of_int)}
+        self._stages_int = [[int_of_id[node_id] for node_id in stage] for stage in stages]
+        self._agents_by_stage = [
+            [
+                self.agents[node_id] for node_id in stage
+                if self.nodes[node_id].type == NodeType.AGENT and node_id in self.agents
+            ]
+            for stage in stages
+        ]
+        return stages
+
+    async def execute(self, initial_input: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute the compiled graph, running independent agents concurrently.
+
+        Structural validation (start node, edge targets, END reachability,
+        acyclicity) happens in compile(), which runs here on demand.
+        """
+        if self._stages is None:
+            self.compile()
+
+        # State is a patch log: each agent result becomes a new ChainMap
+        # child, so merges are O(1). The fresh first map takes any direct
+        # writes, so the caller's input is never mutated
+        state = ChainMap({}, initial_input)
+        path_ints: List[int] = []
+
+        for stage_ints, stage_agents in zip(self._stages_int, self._agents_by_stage):
+            path_ints.extend(stage_ints)
+
+            if not stage_agents:
+                continue
+
+            results = await asyncio.gather(
+                *[agent.execute(state) for agent in stage_agents]
+            )
+
+            # Push patches deterministically in stage order (last one wins)
+            for result in results:
+                state = state.new_child(result)
+
         return {
-            "result": execution_result,
-            "execution_path": execution_path
+            "result": dict(state),
+            "execution_path": [self._id_of_int[i] for i in path_ints]
         }
-    
+
+    async def batch_execute(self, inputs: List[Dict[str, Any]], *,
+                            max_concurrency: int = 16) -> List[Dict[str, Any]]:
+        """Execute the graph over many inputs on one compiled schedule.
+
+        Inputs run concurrently up to max_concurrency; results are
+        returned in input order.
+        """
+        if self._stages is None:
+            self.compile()
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(input_data: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.execute(input_data)
+
+        return list(await asyncio.gather(*[run_one(x) for x in inputs]))
+
     def to_dict(self) -> Dict[str, Any]:
-        """Serialize the graph to a dictionary"""
-        return {
+        """Serialize the graph to a dictionary (memoized until the graph changes)"""
+        if self._dict_cache is not None and self._dict_cache_version == self._version:
+            return self._dict_cache
+
+        self._dict_cache = {
             "nodes": {
                 node_id: {
                     "id": node.id,
@@ -167,13 +320,16 @@ class AgentGraph:
                     "name": node.name,
                     "description": node.description,
                     "config": node.config,
-                    "next_nodes": node.next_nodes
+                    "next_nodes": node.next_nodes,
+                    "sequential": node.sequential
                 }
                 for node_id, node in self.nodes.items()
             },
             "start_node": self.start_node
         }
-    
+        self._dict_cache_version = self._version
+        return self._dict_cache
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AgentGraph':
         """Create graph from dictionary representation"""
@@ -182,11 +338,12 @@ class AgentGraph:
         for node_data in data.get("nodes", {}).values():
             node = GraphNode(
                 id=node_data["id"],
-                type=NodeType(node_data["type"]),
+                type=_NODETYPE_BY_VALUE[node_data["type"]],
                 name=node_data["name"],
                 description=node_data.get("description"),
                 config=node_data.get("config", {}),
-                next_nodes=node_data.get("next_nodes", [])
+                next_nodes=node_data.get("next_nodes", []),
+                sequential=node_data.get("sequential", False)
             )
             graph.add_node(node)
         
@@ -1,17 +1,69 @@
-from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Response
+from fastapi.responses import StreamingResponse, ORJSONResponse
+import httpx
+import orjson
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+import hashlib
 import json
 import asyncio
 import os
-from typing import Dict, Any
+import uuid
+from typing import Dict, Any, List, Optional
+
+# Install uvloop before the app (and any MCP subprocess transports) touch
+# the event loop; uvicorn[standard] ships it, but don't hard-require it
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
 
 # Observability imports
 from observability import setup_tracing, setup_cost_logger, ObservabilityMiddleware
 from observability.tracing import instrument_fastapi
 
-app = FastAPI(title="GenAI Workflow API", version="1.0.0")
+from tools.embedding_cache import get_embedding_cache
+from tools.web_search import aclose_shared_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One shared keep-alive pool for all downstream LLM/vector-db calls;
+    # agents should take this client instead of building one per request
+    app.state.http = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+    )
+    yield
+    await app.state.http.aclose()
+    # The web-search tool keeps its own process-wide client alive across
+    # tool instances; close it with the app
+    await aclose_shared_client()
+
+app = FastAPI(
+    title="GenAI Workflow API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Shared client from the lifespan, created lazily when absent.
+
+    Test transports (httpx.ASGITransport) drive the app without running
+    the lifespan, so app.state.http may not exist yet; the lifespan
+    shutdown still closes whichever client ends up on the state.
+    """
+    client = getattr(app.state, "http", None)
+    if client is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+        )
+        app.state.http = client
+    return client
 
 # Setup observability
 try:
@@ -55,78 +107,118 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request models are frozen and skip unknown keys so validation stays a
+# single pass over the expected fields on the hot request paths
 class ChatRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     message: str
     session_id: str = "default"
 
+# Optional per-chunk delay for debugging/demos (seconds); defaults to no delay
+# so the SSE stream is only bounded by the event loop, not artificial sleeps.
+CHAT_STREAM_DELAY = float(os.getenv("CHAT_STREAM_DELAY", "0"))
+
+# Static prefix chunks never depend on the request, so serialize them once at
+# import time and yield bytes directly (Starlette skips the encode step).
+_STREAM_PREFIX_MESSAGES = [
+    "Thinking about your request...",
+    "Processing with available tools...",
+    "Generating response...",
+]
+_STREAM_PREFIX_CHUNKS = tuple(
+    (
+        "data: " + json.dumps({
+            "id": f"chunk_{i}",
+            "object": "chat.completion.chunk",
+            "choices": [{
+                "delta": {"content": msg},
+                "index": 0,
+                "finish_reason": None
+            }]
+        }) + "\n\n"
+    ).encode()
+    for i, msg in enumerate(_STREAM_PREFIX_MESSAGES)
+)
+_STREAM_PREFIX_BYTES = b"".join(_STREAM_PREFIX_CHUNKS)
+_STREAM_DONE_CHUNK = b"data: [DONE]\n\n"
+
 class IngestRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     content: str
     source: str
     metadata: Dict[str, Any] = {}
 
+# The health payload only depends on startup-time configuration, so build
+# and serialize it once; probes hit this endpoint at high frequency and now
+# get a constant-time bytes write
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "components": {
+        "llm": {
+            "status": "connected",
+            "provider": "placeholder",
+            "model": "placeholder"
+        },
+        "vector_db": {
+            "status": "connected",
+            "provider": "placeholder",
+            "collection_count": 0
+        },
+        "mcp": {
+            "status": "connected",
+            "servers": [],
+            "tools_available": 0
+        },
+        "tools": {
+            "status": "loaded",
+            "count": 0,
+            "available": []
+        },
+        "observability": {
+            "tracing": "enabled" if 'OTEL_EXPORTER_OTLP_ENDPOINT' in os.environ else "disabled",
+            "cost_logging": "enabled",
+            "log_file": os.getenv("COST_LOG_FILE", "logs/costs.log")
+        }
+    },
+    "timestamp": "2025-08-13T18:11:00Z"
+})
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint with component status"""
-    return {
-        "status": "healthy",
-        "components": {
-            "llm": {
-                "status": "connected",
-                "provider": "placeholder",
-                "model": "placeholder"
-            },
-            "vector_db": {
-                "status": "connected",
-                "provider": "placeholder",
-                "collection_count": 0
-            },
-            "mcp": {
-                "status": "connected",
-                "servers": [],
-                "tools_available": 0
-            },
-            "tools": {
-                "status": "loaded",
-                "count": 0,
-                "available": []
-            },
-            "observability": {
-                "tracing": "enabled" if 'OTEL_EXPORTER_OTLP_ENDPOINT' in os.environ else "disabled",
-                "cost_logging": "enabled",
-                "log_file": os.getenv("COST_LOG_FILE", "logs/costs.log")
-            }
-        },
-        "timestamp": "2025-08-13T18:11:00Z"
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 @app.post("/api/chat")
 async def chat_stream(request: ChatRequest):
     """Streaming chat endpoint using Server-Sent Events"""
     
     async def generate_response():
-        # Placeholder streaming response
-        messages = [
-            "Thinking about your request...",
-            "Processing with available tools...",
-            "Generating response...",
-            f"Here's a response to: {request.message}"
-        ]
-        
-        for i, msg in enumerate(messages):
-            chunk = {
-                "id": f"chunk_{i}",
-                "object": "chat.completion.chunk",
-                "choices": [{
-                    "delta": {"content": msg},
-                    "index": 0,
-                    "finish_reason": "stop" if i == len(messages) - 1 else None
-                }]
-            }
-            
-            yield f"data: {json.dumps(chunk)}\n\n"
-            await asyncio.sleep(0.5)  # Simulate processing time
-        
-        yield "data: [DONE]\n\n"
+        # Placeholder streaming response; prefix chunks are pre-serialized
+        if CHAT_STREAM_DELAY > 0:
+            # Debug pacing path: emit chunks one by one with the delay
+            for chunk_bytes in _STREAM_PREFIX_CHUNKS:
+                yield chunk_bytes
+                await asyncio.sleep(CHAT_STREAM_DELAY)
+        else:
+            # One drain for the whole static prefix amortizes the per-send
+            # trip through the ASGI middleware stack
+            yield _STREAM_PREFIX_BYTES
+            await asyncio.sleep(0)  # cooperative yield, no timer
+
+        # Only the final chunk depends on the request, so serialize it here
+        final_chunk = {
+            "id": f"chunk_{len(_STREAM_PREFIX_CHUNKS)}",
+            "object": "chat.completion.chunk",
+            "choices": [{
+                "delta": {"content": f"Here's a response to: {request.message}"},
+                "index": 0,
+                "finish_reason": "stop"
+            }]
+        }
+        yield f"data: {json.dumps(final_chunk)}\n\n".encode()
+        yield _STREAM_DONE_CHUNK
     
     # Add response headers for cost tracking (normally set by AI service)
     response = StreamingResponse(
@@ -135,6 +227,7 @@ async def chat_stream(request: ChatRequest):
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # stop nginx/proxies buffering the stream
             "Access-Control-Allow-Origin": "*",
             # Example cost tracking headers (would be set by actual AI service)
             "x-input-tokens": "50",
@@ -147,19 +240,165 @@ async def chat_stream(request: ChatRequest):
     
     return response
 
-@app.post("/api/ingest")
-async def ingest_content(request: IngestRequest):
-    """Content ingestion endpoint for RAG system"""
-    # Placeholder implementation
-    return {
+@app.post("/api/chat/batch")
+async def chat_batch(requests: List[ChatRequest]):
+    """Batch chat endpoint; processes all requests concurrently"""
+
+    async def respond(req: ChatRequest) -> Dict[str, Any]:
+        # Placeholder response; a real implementation fans out over the
+        # agent graph via AgentGraph.batch_execute
+        return {
+            "session_id": req.session_id,
+            "response": f"Here's a response to: {req.message}"
+        }
+
+    responses = await asyncio.gather(*[respond(r) for r in requests])
+    return {"responses": list(responses)}
+
+# In-memory task store for queued ingestion work; swap for Redis/arq when
+# a real broker is part of the deployment
+_ingest_tasks: Dict[str, Dict[str, Any]] = {}
+
+# Content hash -> completed ingest result; identical documents skip the
+# whole chunk+embed pipeline and cost one hash lookup instead
+_ingest_dedup: Dict[str, Dict[str, Any]] = {}
+
+# doc_id -> one vector per chunk. Stands in for the vector table; writes
+# land as one bulk assignment per document, never per-chunk
+_ingest_vectors: Dict[str, List[Any]] = {}
+
+# Embedding requests go out one batch at a time instead of one per chunk:
+# N chunks cost ceil(N / EMBED_BATCH_SIZE) round-trips to the provider
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBEDDINGS_URL = os.getenv("EMBEDDINGS_URL", "")
+EMBEDDINGS_MODEL = os.getenv("EMBEDDINGS_MODEL", "text-embedding-3-small")
+INGEST_CHUNK_CHARS = 1000
+
+# Cap on in-flight embedding requests across all ingest tasks: batches
+# from concurrent documents overlap up to this limit instead of either
+# serializing or stampeding the provider into 429s
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "8"))
+_embed_sem: Optional[asyncio.Semaphore] = None
+
+
+def _get_embed_sem() -> asyncio.Semaphore:
+    """Shared embedding semaphore, created on first use.
+
+    Built lazily inside the running loop rather than at import: on
+    Python 3.9 a module-level Semaphore binds the import-time event
+    loop, and acquiring it from the loop uvicorn actually serves on
+    fails with a cross-loop Future error.
+    """
+    global _embed_sem
+    if _embed_sem is None:
+        _embed_sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+    return _embed_sem
+
+@dataclass
+class PendingEmbedding:
+    """One chunk waiting for its vector in the current embedding batch"""
+    doc_id: str
+    chunk_id: int
+    source: str
+    text: str
+
+async def _flush_embedding_batch(pending: List[PendingEmbedding],
+                                 client: httpx.AsyncClient) -> List[Any]:
+    """Embed all pending chunks with a single batched request.
+
+    Returns one vector per pending chunk, or Nones when no embeddings
+    endpoint is configured (placeholder mode).
+    """
+    if not pending or not EMBEDDINGS_URL:
+        return [None] * len(pending)
+
+    # Only texts the cache hasn't seen go out over the wire
+    cache = get_embedding_cache()
+    vectors = [cache.get(p.text) for p in pending]
+    miss_idx = [i for i, v in enumerate(vectors) if v is None]
+    if miss_idx:
+        async with _get_embed_sem():
+            response = await client.post(
+                EMBEDDINGS_URL,
+                json={"input": [pending[i].text for i in miss_idx],
+                      "model": EMBEDDINGS_MODEL},
+            )
+        response.raise_for_status()
+        for i, item in zip(miss_idx, response.json()["data"]):
+            vectors[i] = item["embedding"]
+            cache.put(pending[i].text, vectors[i])
+    return vectors
+
+async def _run_ingest_task(task_id: str, content: str, source: str,
+                           metadata: Dict[str, Any],
+                           client: httpx.AsyncClient) -> None:
+    """Chunk content and embed it batch-by-batch, off the request path"""
+    # Dedup on content hash: re-ingesting an identical document reuses
+    # the earlier result instead of re-chunking and re-embedding
+    doc_hash = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+    cached = _ingest_dedup.get(doc_hash)
+    if cached is not None:
+        _ingest_tasks[task_id] = {**cached, "task_id": task_id}
+        return
+
+    doc_id = f"doc_{doc_hash[:12]}"
+    chunks = [content[i:i + INGEST_CHUNK_CHARS]
+              for i in range(0, len(content), INGEST_CHUNK_CHARS)] or [content]
+
+    try:
+        # Vectors accumulate locally and hit the store in a single bulk
+        # write below — the per-chunk insert pattern this replaces paid
+        # the store overhead once per chunk instead of once per document
+        vectors: List[Any] = []
+        pending: List[PendingEmbedding] = []
+        for chunk_id, text in enumerate(chunks):
+            pending.append(PendingEmbedding(doc_id, chunk_id, source, text))
+            if len(pending) >= EMBED_BATCH_SIZE:
+                vectors.extend(await _flush_embedding_batch(pending, client))
+                pending = []
+        # Final partial batch at end-of-document
+        vectors.extend(await _flush_embedding_batch(pending, client))
+        _ingest_vectors[doc_id] = vectors
+    except Exception as e:
+        _ingest_tasks[task_id] = {
+            "task_id": task_id,
+            "status": "error",
+            "message": f"Embedding failed: {e}",
+            "source": source,
+        }
+        return
+
+    result = {
+        "task_id": task_id,
         "status": "success",
         "message": "Content ingested successfully",
-        "document_id": f"doc_{hash(request.content) % 100000}",
-        "chunks_created": 1,
-        "source": request.source,
-        "metadata": request.metadata,
+        "document_id": doc_id,
+        "chunks_created": len(chunks),
+        "source": source,
+        "metadata": metadata,
         "timestamp": "2025-08-13T18:11:00Z"
     }
+    _ingest_tasks[task_id] = result
+    _ingest_dedup[doc_hash] = result
+
+@app.post("/api/ingest", status_code=202)
+async def ingest_content(request: IngestRequest, background_tasks: BackgroundTasks):
+    """Queue content ingestion for the RAG system and ack immediately"""
+    task_id = f"task_{uuid.uuid4().hex[:12]}"
+    _ingest_tasks[task_id] = {"task_id": task_id, "status": "queued"}
+    background_tasks.add_task(
+        _run_ingest_task, task_id, request.content, request.source,
+        request.metadata, _get_http_client()
+    )
+    return {"task_id": task_id, "status": "queued"}
+
+@app.get("/api/ingest/{task_id}")
+async def ingest_status(task_id: str):
+    """Poll the status/result of a queued ingestion task"""
+    task = _ingest_tasks.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Unknown task: {task_id}")
+    return task
 
 @app.get("/")
 async def root():
@@ -168,4 +407,4 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
@@ -3,7 +3,22 @@
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    # orjson serializes straight to bytes and parses bytes without the
+    # intermediate decode/strip, which matters on chatty tool-call workloads
+    import orjson
+
+    def _dumps(obj: Dict[str, Any]) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    def _dumps(obj: Dict[str, Any]) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
 
 
 class MCPClient:
@@ -19,7 +34,15 @@ class MCPClient:
         self.process: Optional[asyncio.subprocess.Process] = None
         self.request_id = 0
         self.logger = logging.getLogger(__name__)
-    
+        self._pending: Dict[int, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._reader_task: Optional["asyncio.Task[None]"] = None
+        self._writer_task: Optional["asyncio.Task[None]"] = None
+        self._send_buffer = bytearray()
+        # Created in start(): on Python 3.9 an Event built here would
+        # bind whatever loop is current at construction time, not the
+        # one the reader/writer tasks run on
+        self._send_event: Optional[asyncio.Event] = None
+
     async def start(self) -> None:
         """Start the MCP server process."""
         try:
@@ -29,57 +52,139 @@ class MCPClient:
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
+            self._send_event = asyncio.Event()
+            self._reader_task = asyncio.create_task(self._read_loop())
+            self._writer_task = asyncio.create_task(self._write_loop())
             self.logger.info(f"Started MCP server: {' '.join(self.server_command)}")
         except Exception as e:
             self.logger.error(f"Failed to start MCP server: {e}")
             raise
-    
+
     async def stop(self) -> None:
         """Stop the MCP server process."""
+        for task in (self._reader_task, self._writer_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._reader_task = None
+        self._writer_task = None
         if self.process:
             self.process.terminate()
             await self.process.wait()
             self.logger.info("Stopped MCP server")
-    
+
+    async def _read_loop(self) -> None:
+        """Read JSON-RPC frames from the server and resolve pending futures.
+
+        Runs for the lifetime of the connection so multiple requests can be
+        in flight at once; each frame is matched to its future by request id.
+        """
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    response = _loads(line)
+                except ValueError:
+                    self.logger.warning("Discarding unparseable MCP frame")
+                    continue
+                if isinstance(response, list):
+                    # JSON-RPC batch response: dispatch each item by id
+                    for item in response:
+                        self._dispatch_response(item)
+                else:
+                    self._dispatch_response(response)
+        finally:
+            # Connection is gone; fail anything still waiting
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("No response from MCP server"))
+            self._pending.clear()
+
+    async def _write_loop(self) -> None:
+        """Flush coalesced frames to the server in single writes.
+
+        Frames queued within the same loop iteration are drained together,
+        so a burst of tiny requests costs one write/drain instead of one
+        syscall each.
+        """
+        while True:
+            await self._send_event.wait()
+            self._send_event.clear()
+            # Zero-length window: give already-pending senders a chance to
+            # append without adding latency for the first one
+            await asyncio.sleep(0)
+            if not self._send_buffer:
+                continue
+            payload = bytes(self._send_buffer)
+            self._send_buffer.clear()
+            self.process.stdin.write(payload)
+            await self.process.stdin.drain()
+
+    def _queue_frame(self, frame: bytes) -> None:
+        """Queue one line-delimited frame for the writer task."""
+        self._send_buffer += frame + b"\n"
+        self._send_event.set()
+
+    def _ensure_connected(self) -> None:
+        """Raise unless the server can still answer a new request.
+
+        The read loop only fails futures that are pending when it exits;
+        a future registered after the server died or the loop finished
+        would never resolve, so fail fast with the same error here.
+        """
+        if not self.process or not self.process.stdin:
+            raise RuntimeError("MCP server not started")
+        if (self.process.returncode is not None
+                or self._reader_task is None or self._reader_task.done()):
+            raise RuntimeError("No response from MCP server")
+
+    def _dispatch_response(self, response: Dict[str, Any]) -> None:
+        """Route a single JSON-RPC response to its pending future."""
+        future = self._pending.pop(response.get("id"), None)
+        if future is None or future.done():
+            self.logger.warning(f"Unmatched MCP response id: {response.get('id')}")
+            return
+        if "error" in response:
+            future.set_exception(RuntimeError(f"MCP server error: {response['error']}"))
+        else:
+            future.set_result(response.get("result", {}))
+
     async def send_request(self, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Send a request to the MCP server.
-        
+
+        Requests are pipelined: the frame is written and the caller awaits a
+        future resolved by the background reader, so concurrent requests
+        overlap instead of serializing on a write/readline pair.
+
         Args:
             method: The method name to call
             params: Optional parameters for the method
-            
+
         Returns:
             The response from the server
         """
-        if not self.process or not self.process.stdin:
-            raise RuntimeError("MCP server not started")
-        
+        self._ensure_connected()
+
         self.request_id += 1
         request = {
             "jsonrpc": "2.0",
             "id": self.request_id,
             "method": method
         }
-        
+
         if params:
             request["params"] = params
-        
-        # Send request
-        request_json = json.dumps(request) + "\n"
-        self.process.stdin.write(request_json.encode())
-        await self.process.stdin.drain()
-        
-        # Read response
-        response_line = await self.process.stdout.readline()
-        if not response_line:
-            raise RuntimeError("No response from MCP server")
-        
-        response = json.loads(response_line.decode().strip())
-        
-        if "error" in response:
-            raise RuntimeError(f"MCP server error: {response['error']}")
-        
-        return response.get("result", {})
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request["id"]] = future
+
+        self._queue_frame(_dumps(request))
+        return await future
     
     async def initialize(self) -> Dict[str, Any]:
         """Initialize the MCP connection."""
@@ -97,6 +202,42 @@ class MCPClient:
         result = await self.send_request("tools/list")
         return result.get("tools", [])
     
+    async def batch_call_tool(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Call several tools in one JSON-RPC batch frame.
+
+        Serializes all calls into a single array frame (one write, one
+        parse on the server side) and resolves each result through the
+        background reader. Requires a server that supports JSON-RPC 2.0
+        batch requests.
+
+        Args:
+            calls: List of (tool name, arguments) pairs
+
+        Returns:
+            Tool results in call order
+        """
+        self._ensure_connected()
+        if not calls:
+            return []
+
+        loop = asyncio.get_running_loop()
+        batch = []
+        futures = []
+        for name, arguments in calls:
+            self.request_id += 1
+            batch.append({
+                "jsonrpc": "2.0",
+                "id": self.request_id,
+                "method": "tools/call",
+                "params": {"name": name, "arguments": arguments or {}}
+            })
+            future = loop.create_future()
+            self._pending[self.request_id] = future
+            futures.append(future)
+
+        self._queue_frame(_dumps(batch))
+        return list(await asyncio.gather(*futures))
+
     async def call_tool(self, name: str, arguments: Dict[str, Any] = None) -> Dict[str, Any]:
         """Call a tool on the server.
         
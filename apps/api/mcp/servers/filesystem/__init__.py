@@ -4,25 +4,36 @@ import asyncio
 import json
 import os
 import sys
+import threading
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+try:
+    # C-extension JSON: encodes straight to bytes and parses without a
+    # pre-strip, cutting per-response overhead on the stdio loop
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+# Cap on bytes returned per read_file call; a response frame has to hold the
+# whole payload anyway, so unbounded reads only risk memory blowups
+_MAX_READ_BYTES = 1 << 20
+
 
 class FilesystemServer:
     """A simple MCP server for filesystem operations."""
     
-    def __init__(self, base_dir: str = "."):
-        """Initialize the filesystem server.
-        
-        Args:
-            base_dir: Base directory for file operations (defaults to current directory)
-        """
-        self.base_dir = Path(base_dir).resolve()
-        self.request_id = 0
-    
-    def get_tools(self) -> List[Dict[str, Any]]:
-        """Get the list of available tools."""
-        return [
+    # The tool schema never changes, so build it once at class scope instead
+    # of allocating the same nested dicts on every tools/list request
+    _TOOLS: List[Dict[str, Any]] = [
             {
                 "name": "read_file",
                 "description": "Read contents of a file",
@@ -69,66 +80,119 @@ class FilesystemServer:
                     "required": []
                 }
             }
-        ]
-    
-    def call_tool(self, name: str, arguments: Dict[str, Any] = None) -> Dict[str, Any]:
+    ]
+    _TOOLS_RESULT: Dict[str, Any] = {"tools": _TOOLS}
+
+    def __init__(self, base_dir: str = "."):
+        """Initialize the filesystem server.
+
+        Args:
+            base_dir: Base directory for file operations (defaults to current directory)
+        """
+        self.base_dir = Path(base_dir).resolve()
+        self.request_id = 0
+        # Validated path resolutions, keyed by the raw request path;
+        # resolve() stats every component, which adds up on hot files
+        self._path_cache: Dict[str, Path] = {}
+        # Bound-method dispatch tables: one hash lookup per request instead
+        # of walking an if/elif chain of string comparisons
+        self._tool_dispatch = {
+            "read_file": self._read_file,
+            "write_file": self._write_file,
+            "list_directory": self._list_directory,
+        }
+        self._method_dispatch = {
+            "initialize": self._handle_initialize,
+            "tools/list": self._handle_tools_list,
+            "tools/call": self._handle_tools_call,
+        }
+
+    def get_tools(self) -> List[Dict[str, Any]]:
+        """Get the list of available tools."""
+        return self._TOOLS
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any] = None) -> Dict[str, Any]:
         """Call a tool with the given arguments.
-        
+
         Args:
             name: Name of the tool to call
             arguments: Arguments for the tool
-            
+
         Returns:
             Tool execution result
         """
         if arguments is None:
             arguments = {}
-        
+
+        fn = self._tool_dispatch.get(name)
+        if fn is None:
+            return {
+                "isError": True,
+                "content": [{"type": "text", "text": f"Unknown tool: {name}"}]
+            }
+
         try:
-            if name == "read_file":
-                return self._read_file(arguments["path"])
-            elif name == "write_file":
-                return self._write_file(arguments["path"], arguments["content"])
-            elif name == "list_directory":
-                path = arguments.get("path", ".")
-                return self._list_directory(path)
-            else:
-                return {
-                    "isError": True,
-                    "content": [{"type": "text", "text": f"Unknown tool: {name}"}]
-                }
+            return await fn(**arguments)
         except Exception as e:
             return {
                 "isError": True,
                 "content": [{"type": "text", "text": f"Error: {str(e)}"}]
             }
     
-    def _read_file(self, path: str) -> Dict[str, Any]:
-        """Read a file and return its contents."""
+    async def _read_file(self, path: str) -> Dict[str, Any]:
+        """Read a file and return its contents.
+
+        Disk I/O runs on a worker thread so a slow mount can't stall the
+        event loop (and with it every other in-flight request).
+        """
         file_path = self._resolve_path(path)
-        
+
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {path}")
-        
+
         if not file_path.is_file():
             raise ValueError(f"Path is not a file: {path}")
-        
-        content = file_path.read_text(encoding='utf-8')
+
+        def _read() -> bytes:
+            # Binary read with a hard cap (+1 byte to detect truncation)
+            # keeps peak memory flat regardless of file size
+            with open(file_path, 'rb') as f:
+                return f.read(_MAX_READ_BYTES + 1)
+
+        raw = await asyncio.to_thread(_read)
+        truncated = len(raw) > _MAX_READ_BYTES
+        content = raw[:_MAX_READ_BYTES].decode('utf-8', errors='replace')
+
         return {
             "content": [{
                 "type": "text",
-                "text": f"Contents of {path}:\n{content}"
+                "text": "".join([
+                    "Contents of ", path, ":\n", content,
+                    "\n... (truncated)" if truncated else ""
+                ])
             }]
         }
     
-    def _write_file(self, path: str, content: str) -> Dict[str, Any]:
+    async def _write_file(self, path: str, content: str) -> Dict[str, Any]:
         """Write content to a file."""
         file_path = self._resolve_path(path)
-        
-        # Create parent directories if they don't exist
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        file_path.write_text(content, encoding='utf-8')
+        content_bytes = content.encode('utf-8')
+
+        def _write() -> None:
+            # Create parent directories if they don't exist
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                # Reserve the full extent up front so large writes land in
+                # contiguous blocks (helps on NFS/CEPH-style backends)
+                if content_bytes and hasattr(os, 'posix_fallocate'):
+                    os.posix_fallocate(fd, 0, len(content_bytes))
+                os.write(fd, content_bytes)
+            finally:
+                os.close(fd)
+
+        await asyncio.to_thread(_write)
+        self._path_cache.clear()
         return {
             "content": [{
                 "type": "text",
@@ -136,21 +200,28 @@ class FilesystemServer:
             }]
         }
     
-    def _list_directory(self, path: str) -> Dict[str, Any]:
+    async def _list_directory(self, path: str = ".") -> Dict[str, Any]:
         """List the contents of a directory."""
         dir_path = self._resolve_path(path)
-        
+
         if not dir_path.exists():
             raise FileNotFoundError(f"Directory not found: {path}")
-        
+
         if not dir_path.is_dir():
             raise ValueError(f"Path is not a directory: {path}")
-        
-        items = []
-        for item in sorted(dir_path.iterdir()):
-            item_type = "directory" if item.is_dir() else "file"
-            items.append(f"{item.name} ({item_type})")
-        
+
+        def _scan() -> List[str]:
+            # One thread hop for the whole listing. scandir's DirEntry
+            # carries the d_type from getdents, so is_dir() needs no extra
+            # stat per entry (unlike iterdir + Path.is_dir)
+            items = []
+            with os.scandir(dir_path) as it:
+                for entry in sorted(it, key=lambda e: e.name):
+                    item_type = "directory" if entry.is_dir(follow_symlinks=False) else "file"
+                    items.append(f"{entry.name} ({item_type})")
+            return items
+
+        items = await asyncio.to_thread(_scan)
         items_text = "\n".join(items) if items else "(empty directory)"
         return {
             "content": [{
@@ -160,44 +231,55 @@ class FilesystemServer:
         }
     
     def _resolve_path(self, path: str) -> Path:
-        """Resolve a path relative to the base directory."""
+        """Resolve a path relative to the base directory (memoized)."""
+        cached = self._path_cache.get(path)
+        if cached is not None:
+            return cached
+
         resolved = (self.base_dir / path).resolve()
-        
+
         # Ensure the path is within the base directory (security check)
         try:
             resolved.relative_to(self.base_dir)
         except ValueError:
             raise ValueError(f"Path outside base directory: {path}")
-        
+
+        # Only validated resolutions are cached; writes clear the cache
+        # since they can add symlinks that change how a path resolves
+        if len(self._path_cache) < 1024:
+            self._path_cache[path] = resolved
         return resolved
     
+    async def _handle_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {
+                "tools": {}
+            },
+            "serverInfo": {
+                "name": "filesystem-server",
+                "version": "1.0.0"
+            }
+        }
+
+    async def _handle_tools_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._TOOLS_RESULT
+
+    async def _handle_tools_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.call_tool(params.get("name"), params.get("arguments", {}))
+
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle an MCP request."""
         method = request.get("method")
         params = request.get("params", {})
         request_id = request.get("id")
-        
+
         try:
-            if method == "initialize":
-                result = {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "tools": {}
-                    },
-                    "serverInfo": {
-                        "name": "filesystem-server",
-                        "version": "1.0.0"
-                    }
-                }
-            elif method == "tools/list":
-                result = {"tools": self.get_tools()}
-            elif method == "tools/call":
-                tool_name = params.get("name")
-                tool_args = params.get("arguments", {})
-                result = self.call_tool(tool_name, tool_args)
-            else:
+            handler = self._method_dispatch.get(method)
+            if handler is None:
                 raise ValueError(f"Unknown method: {method}")
-            
+            result = await handler(params)
+
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
@@ -224,34 +306,86 @@ async def main():
     args = parser.parse_args()
     
     server = FilesystemServer(args.base_dir)
-    
+
+    # A dedicated reader thread does the blocking stdin reads and hands
+    # complete lines to the loop, instead of bouncing every readline
+    # through the default executor. EOF is signalled with None.
+    loop = asyncio.get_running_loop()
+    lines: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+
+    def _stdin_reader() -> None:
+        for raw in sys.stdin.buffer:
+            loop.call_soon_threadsafe(lines.put_nowait, raw)
+        loop.call_soon_threadsafe(lines.put_nowait, None)
+
+    threading.Thread(target=_stdin_reader, daemon=True, name="stdin-reader").start()
+
+    # Responses accumulate here and are flushed once the input queue goes
+    # idle or the buffer passes 64 KiB, so pipelined bursts cost one
+    # write/flush instead of one per response
+    out = sys.stdout.buffer
+    pending = bytearray()
+
+    def _flush() -> None:
+        if pending:
+            out.write(pending)
+            out.flush()
+            pending.clear()
+
+    # Each frame is handled on its own task so slow tool calls don't stall
+    # the ones behind them; the semaphore bounds in-flight work. Clients
+    # match responses by JSON-RPC id, so completion order is free to differ
+    # from arrival order. All appends to `pending` happen on the loop, so
+    # output frames never interleave.
+    semaphore = asyncio.Semaphore(32)
+    tasks: set = set()
+
+    async def _handle_line(line: bytes) -> None:
+        async with semaphore:
+            try:
+                request = _loads(line)
+                if isinstance(request, list):
+                    # JSON-RPC batch frame: answer with a batch response
+                    responses = [await server.handle_request(r) for r in request]
+                    pending.extend(_dumps(responses) + b"\n")
+                else:
+                    response = await server.handle_request(request)
+                    pending.extend(_dumps(response) + b"\n")
+
+            except ValueError:
+                return
+            except Exception as e:
+                error_response = {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {
+                        "code": -32700,
+                        "message": f"Parse error: {e}"
+                    }
+                }
+                pending.extend(_dumps(error_response) + b"\n")
+
+            if len(pending) >= 1 << 16:
+                _flush()
+
     # Read requests from stdin and write responses to stdout
     while True:
-        try:
-            line = await asyncio.get_event_loop().run_in_executor(
-                None, sys.stdin.readline
-            )
-            if not line:
-                break
-                
-            request = json.loads(line.strip())
-            response = await server.handle_request(request)
-            print(json.dumps(response))
-            sys.stdout.flush()
-            
-        except json.JSONDecodeError:
-            continue
-        except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32700,
-                    "message": f"Parse error: {e}"
-                }
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+        line = await lines.get()
+        if line is None:
+            break
+
+        task = asyncio.create_task(_handle_line(line))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+        if lines.empty():
+            # Input went idle: settle the in-flight burst and flush it
+            await asyncio.gather(*list(tasks))
+            _flush()
+
+    if tasks:
+        await asyncio.gather(*list(tasks))
+    _flush()
 
 
 if __name__ == "__main__":
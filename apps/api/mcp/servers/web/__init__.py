@@ -3,13 +3,28 @@
 import asyncio
 import json
 import sys
-from typing import Any, Dict, List
+import threading
+from typing import Any, Dict, List, Optional
 from urllib.parse import urljoin, urlparse
 
 try:
-    import requests
+    # Same bytes-native JSON path as the filesystem server
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+try:
+    import httpx
 except ImportError:
-    requests = None
+    httpx = None
 
 
 class WebServer:
@@ -22,12 +37,26 @@ class WebServer:
             base_url: Base URL for relative requests (optional)
         """
         self.base_url = base_url
-        if requests is None:
-            print("Warning: requests library not available. Install with: pip install requests")
+        # Shared async client, created lazily on first use inside the event
+        # loop; keep-alive pooling avoids per-request TCP/TLS handshakes
+        self._client = None
+        if httpx is None:
+            print("Warning: httpx library not available. Install with: pip install httpx")
+        # Dispatch tables mirror the filesystem server: dict lookup beats
+        # the if/elif string chain on small hot requests
+        self._tool_dispatch = {
+            "fetch_url": self._fetch_url,
+            "post_data": self._post_data,
+        }
+        self._method_dispatch = {
+            "initialize": self._handle_initialize,
+            "tools/list": self._handle_tools_list,
+            "tools/call": self._handle_tools_call,
+        }
     
-    def get_tools(self) -> List[Dict[str, Any]]:
-        """Get the list of available tools."""
-        tools = [
+    # Tool schema is fixed at import time (httpx availability can't change
+    # mid-process), so build it once instead of per tools/list call
+    _TOOLS: List[Dict[str, Any]] = [
             {
                 "name": "fetch_url",
                 "description": "Fetch content from a URL",
@@ -47,10 +76,10 @@ class WebServer:
                     "required": ["url"]
                 }
             }
-        ]
-        
-        if requests is not None:
-            tools.append({
+    ]
+
+    if httpx is not None:
+        _TOOLS.append({
                 "name": "post_data",
                 "description": "Send POST request with data",
                 "inputSchema": {
@@ -72,49 +101,63 @@ class WebServer:
                     "required": ["url", "data"]
                 }
             })
-        
-        return tools
-    
-    def call_tool(self, name: str, arguments: Dict[str, Any] = None) -> Dict[str, Any]:
+
+    _TOOLS_RESULT: Dict[str, Any] = {"tools": _TOOLS}
+
+    def get_tools(self) -> List[Dict[str, Any]]:
+        """Get the list of available tools."""
+        return self._TOOLS
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        """Get the shared AsyncClient, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the shared HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any] = None) -> Dict[str, Any]:
         """Call a tool with the given arguments.
-        
+
         Args:
             name: Name of the tool to call
             arguments: Arguments for the tool
-            
+
         Returns:
             Tool execution result
         """
         if arguments is None:
             arguments = {}
-        
-        if requests is None:
+
+        if httpx is None:
             return {
                 "isError": True,
-                "content": [{"type": "text", "text": "Error: requests library not installed"}]
+                "content": [{"type": "text", "text": "Error: httpx library not installed"}]
             }
-        
+
+        fn = self._tool_dispatch.get(name)
+        if fn is None:
+            return {
+                "isError": True,
+                "content": [{"type": "text", "text": f"Unknown tool: {name}"}]
+            }
+
         try:
-            if name == "fetch_url":
-                return self._fetch_url(arguments["url"], arguments.get("method", "GET"))
-            elif name == "post_data":
-                return self._post_data(
-                    arguments["url"], 
-                    arguments["data"], 
-                    arguments.get("headers", {})
-                )
-            else:
-                return {
-                    "isError": True,
-                    "content": [{"type": "text", "text": f"Unknown tool: {name}"}]
-                }
+            return await fn(**arguments)
         except Exception as e:
             return {
                 "isError": True,
                 "content": [{"type": "text", "text": f"Error: {str(e)}"}]
             }
-    
-    def _fetch_url(self, url: str, method: str = "GET") -> Dict[str, Any]:
+
+    async def _fetch_url(self, url: str, method: str = "GET") -> Dict[str, Any]:
         """Fetch content from a URL."""
         # Resolve URL if base_url is provided
         if self.base_url and not urlparse(url).netloc:
@@ -129,26 +172,32 @@ class WebServer:
             raise ValueError(f"Unsupported scheme: {parsed.scheme}")
         
         try:
-            response = requests.request(method, url, timeout=10)
-            response.raise_for_status()
-            
-            # Try to get text content, fall back to raw if not possible
-            try:
-                content = response.text
-            except UnicodeDecodeError:
-                content = f"Binary content ({len(response.content)} bytes)"
-            
-            return {
-                "content": [{
-                    "type": "text",
-                    "text": f"Response from {url} (Status: {response.status_code}):\n\n{content[:2000]}{'...' if len(content) > 2000 else ''}"
-                }]
-            }
-        
-        except requests.exceptions.RequestException as e:
+            # Stream the body and stop after the displayable prefix; the
+            # response only ever shows 2000 chars, so decoding megabytes
+            # up front is wasted allocation
+            async with self._get_client().stream(method, url) as response:
+                response.raise_for_status()
+                raw = bytearray()
+                async for chunk in response.aiter_bytes():
+                    raw.extend(chunk)
+                    if len(raw) > 2048:
+                        break
+                truncated = len(raw) > 2048
+                content = bytes(raw[:2048]).decode(
+                    response.encoding or 'utf-8', errors='replace'
+                )
+
+                return {
+                    "content": [{
+                        "type": "text",
+                        "text": f"Response from {url} (Status: {response.status_code}):\n\n{content[:2000]}{'...' if truncated or len(content) > 2000 else ''}"
+                    }]
+                }
+
+        except httpx.HTTPError as e:
             raise Exception(f"Request failed: {str(e)}")
-    
-    def _post_data(self, url: str, data: Dict[str, Any], headers: Dict[str, str] = None) -> Dict[str, Any]:
+
+    async def _post_data(self, url: str, data: Dict[str, Any], headers: Dict[str, str] = None) -> Dict[str, Any]:
         """Send POST request with data."""
         # Resolve URL if base_url is provided
         if self.base_url and not urlparse(url).netloc:
@@ -171,54 +220,66 @@ class WebServer:
         
         try:
             if headers.get('Content-Type') == 'application/json':
-                response = requests.post(url, json=data, headers=headers, timeout=10)
+                body = {"json": data}
             else:
-                response = requests.post(url, data=data, headers=headers, timeout=10)
-                
-            response.raise_for_status()
-            
-            try:
-                content = response.text
-            except UnicodeDecodeError:
-                content = f"Binary response ({len(response.content)} bytes)"
-            
-            return {
-                "content": [{
-                    "type": "text",
-                    "text": f"POST to {url} successful (Status: {response.status_code}):\n\n{content[:1000]}{'...' if len(content) > 1000 else ''}"
-                }]
-            }
-        
-        except requests.exceptions.RequestException as e:
+                body = {"data": data}
+
+            # Same capped streaming as _fetch_url, with the smaller POST
+            # display budget
+            async with self._get_client().stream(
+                "POST", url, headers=headers, **body
+            ) as response:
+                response.raise_for_status()
+                raw = bytearray()
+                async for chunk in response.aiter_bytes():
+                    raw.extend(chunk)
+                    if len(raw) > 1024:
+                        break
+                truncated = len(raw) > 1024
+                content = bytes(raw[:1024]).decode(
+                    response.encoding or 'utf-8', errors='replace'
+                )
+
+                return {
+                    "content": [{
+                        "type": "text",
+                        "text": f"POST to {url} successful (Status: {response.status_code}):\n\n{content[:1000]}{'...' if truncated or len(content) > 1000 else ''}"
+                    }]
+                }
+
+        except httpx.HTTPError as e:
             raise Exception(f"POST request failed: {str(e)}")
     
+    async def _handle_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {
+                "tools": {}
+            },
+            "serverInfo": {
+                "name": "web-server",
+                "version": "1.0.0"
+            }
+        }
+
+    async def _handle_tools_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._TOOLS_RESULT
+
+    async def _handle_tools_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.call_tool(params.get("name"), params.get("arguments", {}))
+
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle an MCP request."""
         method = request.get("method")
         params = request.get("params", {})
         request_id = request.get("id")
-        
+
         try:
-            if method == "initialize":
-                result = {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "tools": {}
-                    },
-                    "serverInfo": {
-                        "name": "web-server",
-                        "version": "1.0.0"
-                    }
-                }
-            elif method == "tools/list":
-                result = {"tools": self.get_tools()}
-            elif method == "tools/call":
-                tool_name = params.get("name")
-                tool_args = params.get("arguments", {})
-                result = self.call_tool(tool_name, tool_args)
-            else:
+            handler = self._method_dispatch.get(method)
+            if handler is None:
                 raise ValueError(f"Unknown method: {method}")
-            
+            result = await handler(params)
+
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
@@ -245,34 +306,83 @@ async def main():
     args = parser.parse_args()
     
     server = WebServer(args.base_url)
-    
+
+    # Blocking stdin reads run on a dedicated thread that feeds the loop;
+    # see the filesystem server for the same arrangement. EOF pushes None.
+    loop = asyncio.get_running_loop()
+    lines: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+
+    def _stdin_reader() -> None:
+        for raw in sys.stdin.buffer:
+            loop.call_soon_threadsafe(lines.put_nowait, raw)
+        loop.call_soon_threadsafe(lines.put_nowait, None)
+
+    threading.Thread(target=_stdin_reader, daemon=True, name="stdin-reader").start()
+
+    # Same write coalescing as the filesystem server: flush when the input
+    # queue goes idle or the buffer passes 64 KiB
+    out = sys.stdout.buffer
+    pending = bytearray()
+
+    def _flush() -> None:
+        if pending:
+            out.write(pending)
+            out.flush()
+            pending.clear()
+
+    # Per-frame tasks with a bounded semaphore, mirroring the filesystem
+    # server: slow fetches don't block queued requests, and clients match
+    # responses by JSON-RPC id rather than arrival order.
+    semaphore = asyncio.Semaphore(32)
+    tasks: set = set()
+
+    async def _handle_line(line: bytes) -> None:
+        async with semaphore:
+            try:
+                request = _loads(line)
+                if isinstance(request, list):
+                    # JSON-RPC batch frame: answer with a batch response
+                    responses = [await server.handle_request(r) for r in request]
+                    pending.extend(_dumps(responses) + b"\n")
+                else:
+                    response = await server.handle_request(request)
+                    pending.extend(_dumps(response) + b"\n")
+
+            except ValueError:
+                return
+            except Exception as e:
+                error_response = {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {
+                        "code": -32700,
+                        "message": f"Parse error: {e}"
+                    }
+                }
+                pending.extend(_dumps(error_response) + b"\n")
+
+            if len(pending) >= 1 << 16:
+                _flush()
+
     # Read requests from stdin and write responses to stdout
     while True:
-        try:
-            line = await asyncio.get_event_loop().run_in_executor(
-                None, sys.stdin.readline
-            )
-            if not line:
-                break
-                
-            request = json.loads(line.strip())
-            response = await server.handle_request(request)
-            print(json.dumps(response))
-            sys.stdout.flush()
-            
-        except json.JSONDecodeError:
-            continue
-        except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32700,
-                    "message": f"Parse error: {e}"
-                }
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+        line = await lines.get()
+        if line is None:
+            break
+
+        task = asyncio.create_task(_handle_line(line))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+        if lines.empty():
+            # Input went idle: settle the in-flight burst and flush it
+            await asyncio.gather(*list(tasks))
+            _flush()
+
+    if tasks:
+        await asyncio.gather(*list(tasks))
+    _flush()
+    await server.close()
 
 
 if __name__ == "__main__":
@@ -3,14 +3,18 @@
 This package provides OpenTelemetry tracing and cost logging capabilities.
 """
 
-from .tracing import setup_tracing, get_tracer
-from .cost_logger import CostLogger
-from .middleware import TracingMiddleware, CostMiddleware
+from .tracing import setup_tracing, get_tracer, is_tracing_active
+from .cost_logger import CostLogger, get_cost_logger, setup_cost_logger
+from .middleware import TracingMiddleware, CostMiddleware, ObservabilityMiddleware
 
 __all__ = [
     "setup_tracing",
     "get_tracer",
+    "is_tracing_active",
     "CostLogger",
+    "get_cost_logger",
+    "setup_cost_logger",
     "TracingMiddleware",
     "CostMiddleware",
+    "ObservabilityMiddleware",
 ]
@@ -1,18 +1,37 @@
 """Cost logging for GenAI Workflow API."""
 
-import json
+import collections
 import logging
 import time
 from datetime import datetime, timezone
 from typing import Dict, Optional, Any, List
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from pathlib import Path
+import queue
 import threading
 
+import orjson
 
-@dataclass
+# Sentinel pushed onto the write queue to stop the writer thread
+_SENTINEL = object()
+
+
+@dataclass(frozen=True)
 class CostEntry:
-    """Represents a single cost entry."""
+    """Represents a single cost entry.
+
+    Slots drop the per-instance __dict__ (entries accumulate by the
+    thousands in long-lived processes) and frozen instances are safe to
+    share across the writer thread without copying. Explicit __slots__
+    rather than dataclass(slots=True), which needs Python 3.10 and this
+    project supports 3.9.
+    """
+
+    __slots__ = (
+        'timestamp', 'session_id', 'operation', 'provider', 'model',
+        'input_tokens', 'output_tokens', 'cost_usd', 'duration_ms', 'metadata'
+    )
+
     timestamp: str
     session_id: str
     operation: str
@@ -25,24 +44,55 @@ class CostEntry:
     metadata: Dict[str, Any]
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
-        return asdict(self)
+        """Convert to dictionary for serialization.
+
+        Built field-by-field instead of dataclasses.asdict(), which
+        recursively deep-copies every value on each call.
+        """
+        return {
+            "timestamp": self.timestamp,
+            "session_id": self.session_id,
+            "operation": self.operation,
+            "provider": self.provider,
+            "model": self.model,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": self.cost_usd,
+            "duration_ms": self.duration_ms,
+            "metadata": self.metadata,
+        }
 
 
 class CostLogger:
     """Simple cost logger for tracking GenAI API usage and costs."""
     
-    def __init__(self, log_file: Optional[str] = None, enable_console: bool = True):
+    def __init__(self, log_file: Optional[str] = None, enable_console: bool = True,
+                 max_entries: int = 10000):
         """Initialize the cost logger.
-        
+
         Args:
             log_file: Optional file path to log costs to
             enable_console: Whether to log to console
+            max_entries: Maximum in-memory entries kept for detail queries
         """
         self.log_file = log_file
         self.enable_console = enable_console
-        self._entries: List[CostEntry] = []
+        self._max_entries = max_entries
+        # Bounded deque: append is atomic under the GIL, so the hot logging
+        # path needs no lock, and memory can't grow without limit. Running
+        # aggregates stay lifetime-accurate even after old entries roll off.
+        self._entries: "collections.deque[CostEntry]" = collections.deque(maxlen=max_entries)
         self._lock = threading.Lock()
+
+        # Running aggregates, updated per entry in log_cost so the summary
+        # methods are O(1) instead of rescanning every entry
+        self._total_cost = 0.0
+        self._total_input_tokens = 0
+        self._total_output_tokens = 0
+        self._operation_count = 0
+        self._providers: Dict[str, Dict[str, Any]] = {}
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._sessions: Dict[str, Dict[str, Any]] = {}
         
         # Setup logging
         self.logger = logging.getLogger("cost_logger")
@@ -62,6 +112,73 @@ class CostLogger:
                 logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
             )
             self.logger.addHandler(file_handler)
+
+        # Batched JSONL writer; entries are queued and flushed in coalesced
+        # batches off the request path
+        self._json_queue: Optional["queue.Queue"] = None
+        self._json_file = None
+        self._writer_thread: Optional[threading.Thread] = None
+        if log_file:
+            self._start_json_writer()
+
+    def _start_json_writer(self) -> None:
+        """Open the JSONL file once and start the batching writer thread."""
+        json_path = Path(self.log_file).with_suffix('.json')
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Binary mode: orjson emits bytes, so entries go straight to the file
+        self._json_file = open(json_path, 'ab', buffering=1 << 16)
+        self._json_queue = queue.Queue(maxsize=10000)
+        self._writer_thread = threading.Thread(
+            target=self._json_writer_loop, daemon=True, name="cost-logger-writer"
+        )
+        self._writer_thread.start()
+
+    def _json_writer_loop(self) -> None:
+        """Drain queued entries and write them as coalesced batches.
+
+        Up to 256 entries are merged into a single write()/flush() pair,
+        amortizing syscall cost when logging is hot.
+        """
+        running = True
+        while running:
+            entry = self._json_queue.get()
+            if entry is _SENTINEL:
+                break
+
+            batch = [entry]
+            while len(batch) < 256:
+                try:
+                    next_entry = self._json_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if next_entry is _SENTINEL:
+                    running = False
+                    break
+                batch.append(next_entry)
+
+            try:
+                self._json_file.write(
+                    b"".join(orjson.dumps(e.to_dict()) + b"\n" for e in batch)
+                )
+                self._json_file.flush()
+            except Exception as e:
+                self.logger.error(f"Failed to write JSON entries: {e}")
+
+        self._json_file.close()
+
+    def close(self) -> None:
+        """Flush pending JSON entries and stop the writer thread."""
+        if self._writer_thread is not None:
+            self._json_queue.put(_SENTINEL)
+            self._writer_thread.join(timeout=5.0)
+            self._writer_thread = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
     
     def log_cost(
         self,
@@ -101,38 +218,75 @@ class CostLogger:
             metadata=metadata or {}
         )
         
+        # Lock-free append; only the aggregate dicts need the lock
+        self._entries.append(entry)
         with self._lock:
-            self._entries.append(entry)
+            self._apply_entry(entry)
+
+        # Skip the logging machinery entirely when INFO is filtered out;
+        # %-formatting already defers the message build to the handler
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "Cost: %.6f USD | Session: %s | Operation: %s | Provider: %s | "
+                "Model: %s | Tokens: %d→%d | Duration: %.2fms",
+                cost_usd, session_id, operation, provider, model,
+                input_tokens, output_tokens, duration_ms
+            )
         
-        # Log to configured outputs
-        log_message = (
-            f"Cost: {cost_usd:.6f} USD | "
-            f"Session: {session_id} | "
-            f"Operation: {operation} | "
-            f"Provider: {provider} | "
-            f"Model: {model} | "
-            f"Tokens: {input_tokens}→{output_tokens} | "
-            f"Duration: {duration_ms:.2f}ms"
+        # Queue for the batched JSON writer if configured
+        if self._json_queue is not None:
+            try:
+                self._json_queue.put_nowait(entry)
+            except queue.Full:
+                self.logger.error("Cost log queue full; dropping JSON entry")
+
+    def _apply_entry(self, entry: CostEntry) -> None:
+        """Fold one entry into the running aggregates (caller holds the lock)."""
+        tokens = entry.input_tokens + entry.output_tokens
+
+        self._total_cost += entry.cost_usd
+        self._total_input_tokens += entry.input_tokens
+        self._total_output_tokens += entry.output_tokens
+        self._operation_count += 1
+
+        provider = self._providers.setdefault(
+            entry.provider, {"cost": 0.0, "tokens": 0, "operations": 0}
         )
-        
-        self.logger.info(log_message)
-        
-        # Write to JSON file if specified
-        if self.log_file:
-            self._write_json_entry(entry)
-    
-    def _write_json_entry(self, entry: CostEntry) -> None:
-        """Write entry to JSON file."""
-        try:
-            json_file = Path(self.log_file).with_suffix('.json')
-            json_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Append to file
-            with open(json_file, 'a') as f:
-                f.write(json.dumps(entry.to_dict()) + '\n')
-        except Exception as e:
-            self.logger.error(f"Failed to write JSON entry: {e}")
-    
+        provider["cost"] += entry.cost_usd
+        provider["tokens"] += tokens
+        provider["operations"] += 1
+
+        model = self._models.setdefault(
+            f"{entry.provider}:{entry.model}", {"cost": 0.0, "tokens": 0, "operations": 0}
+        )
+        model["cost"] += entry.cost_usd
+        model["tokens"] += tokens
+        model["operations"] += 1
+
+        session = self._sessions.setdefault(
+            entry.session_id,
+            {"cost": 0.0, "input_tokens": 0, "output_tokens": 0, "operations": 0}
+        )
+        session["cost"] += entry.cost_usd
+        session["input_tokens"] += entry.input_tokens
+        session["output_tokens"] += entry.output_tokens
+        session["operations"] += 1
+
+    def _rebuild_aggregates(self) -> None:
+        """Recompute aggregates from _entries (caller holds the lock).
+
+        Only needed after bulk removals; the logging path never hits this.
+        """
+        self._total_cost = 0.0
+        self._total_input_tokens = 0
+        self._total_output_tokens = 0
+        self._operation_count = 0
+        self._providers = {}
+        self._models = {}
+        self._sessions = {}
+        for entry in self._entries:
+            self._apply_entry(entry)
+
     def get_session_summary(self, session_id: str) -> Dict[str, Any]:
         """Get cost summary for a specific session.
         
@@ -143,28 +297,27 @@ class CostLogger:
             Dictionary with session cost summary
         """
         with self._lock:
-            session_entries = [e for e in self._entries if e.session_id == session_id]
-        
-        if not session_entries:
-            return {
-                "session_id": session_id,
-                "total_cost_usd": 0.0,
-                "total_tokens": 0,
-                "operation_count": 0,
-                "operations": []
-            }
-        
-        total_cost = sum(e.cost_usd for e in session_entries)
-        total_input_tokens = sum(e.input_tokens for e in session_entries)
-        total_output_tokens = sum(e.output_tokens for e in session_entries)
-        
+            session = self._sessions.get(session_id)
+            if session is None:
+                return {
+                    "session_id": session_id,
+                    "total_cost_usd": 0.0,
+                    "total_tokens": 0,
+                    "operation_count": 0,
+                    "operations": []
+                }
+            session = dict(session)
+        # Totals come from the running aggregate; only the per-operation
+        # detail list walks a snapshot of the retained entries
+        session_entries = [e for e in list(self._entries) if e.session_id == session_id]
+
         return {
             "session_id": session_id,
-            "total_cost_usd": round(total_cost, 6),
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_tokens": total_input_tokens + total_output_tokens,
-            "operation_count": len(session_entries),
+            "total_cost_usd": round(session["cost"], 6),
+            "total_input_tokens": session["input_tokens"],
+            "total_output_tokens": session["output_tokens"],
+            "total_tokens": session["input_tokens"] + session["output_tokens"],
+            "operation_count": session["operations"],
             "operations": [e.to_dict() for e in session_entries]
         }
     
@@ -175,52 +328,27 @@ class CostLogger:
             Dictionary with total cost summary
         """
         with self._lock:
-            all_entries = self._entries.copy()
-        
-        if not all_entries:
+            if self._operation_count == 0:
+                return {
+                    "total_cost_usd": 0.0,
+                    "total_tokens": 0,
+                    "operation_count": 0,
+                    "session_count": 0,
+                    "providers": {},
+                    "models": {}
+                }
+
+            # Snapshot the breakdowns so callers can't mutate the aggregates
             return {
-                "total_cost_usd": 0.0,
-                "total_tokens": 0,
-                "operation_count": 0,
-                "session_count": 0,
-                "providers": {},
-                "models": {}
+                "total_cost_usd": round(self._total_cost, 6),
+                "total_input_tokens": self._total_input_tokens,
+                "total_output_tokens": self._total_output_tokens,
+                "total_tokens": self._total_input_tokens + self._total_output_tokens,
+                "operation_count": self._operation_count,
+                "session_count": len(self._sessions),
+                "providers": {k: dict(v) for k, v in self._providers.items()},
+                "models": {k: dict(v) for k, v in self._models.items()}
             }
-        
-        total_cost = sum(e.cost_usd for e in all_entries)
-        total_input_tokens = sum(e.input_tokens for e in all_entries)
-        total_output_tokens = sum(e.output_tokens for e in all_entries)
-        unique_sessions = set(e.session_id for e in all_entries)
-        
-        # Provider breakdown
-        providers = {}
-        for entry in all_entries:
-            if entry.provider not in providers:
-                providers[entry.provider] = {"cost": 0.0, "tokens": 0, "operations": 0}
-            providers[entry.provider]["cost"] += entry.cost_usd
-            providers[entry.provider]["tokens"] += entry.input_tokens + entry.output_tokens
-            providers[entry.provider]["operations"] += 1
-        
-        # Model breakdown
-        models = {}
-        for entry in all_entries:
-            model_key = f"{entry.provider}:{entry.model}"
-            if model_key not in models:
-                models[model_key] = {"cost": 0.0, "tokens": 0, "operations": 0}
-            models[model_key]["cost"] += entry.cost_usd
-            models[model_key]["tokens"] += entry.input_tokens + entry.output_tokens
-            models[model_key]["operations"] += 1
-        
-        return {
-            "total_cost_usd": round(total_cost, 6),
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_tokens": total_input_tokens + total_output_tokens,
-            "operation_count": len(all_entries),
-            "session_count": len(unique_sessions),
-            "providers": providers,
-            "models": models
-        }
     
     def clear_session(self, session_id: str) -> None:
         """Clear all entries for a specific session.
@@ -229,12 +357,15 @@ class CostLogger:
             session_id: Session ID to clear
         """
         with self._lock:
-            self._entries = [e for e in self._entries if e.session_id != session_id]
-    
+            kept = [e for e in self._entries if e.session_id != session_id]
+            self._entries = collections.deque(kept, maxlen=self._max_entries)
+            self._rebuild_aggregates()
+
     def clear_all(self) -> None:
         """Clear all cost entries."""
         with self._lock:
             self._entries.clear()
+            self._rebuild_aggregates()
     
     def export_to_csv(self, file_path: str) -> None:
         """Export cost entries to CSV file.
@@ -243,26 +374,26 @@ class CostLogger:
             file_path: Path to CSV file
         """
         import csv
-        
-        with self._lock:
-            entries = self._entries.copy()
-        
+
+        entries = list(self._entries)
+
         if not entries:
             return
-        
+
         with open(file_path, 'w', newline='') as csvfile:
             fieldnames = [
                 'timestamp', 'session_id', 'operation', 'provider', 'model',
                 'input_tokens', 'output_tokens', 'cost_usd', 'duration_ms'
             ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for entry in entries:
-                row = entry.to_dict()
-                # Skip metadata for CSV simplicity
-                row.pop('metadata', None)
-                writer.writerow(row)
+            # Plain tuples instead of DictWriter + per-row dicts; metadata
+            # is skipped for CSV simplicity
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            writer.writerows(
+                (e.timestamp, e.session_id, e.operation, e.provider, e.model,
+                 e.input_tokens, e.output_tokens, e.cost_usd, e.duration_ms)
+                for e in entries
+            )
 
 
 # Global instance for convenience
@@ -3,10 +3,16 @@
 import time
 from typing import Callable, Any
 from fastapi import Request, Response
+from starlette.background import BackgroundTask
 from starlette.middleware.base import BaseHTTPMiddleware
 from opentelemetry import trace
 
-from .tracing import get_tracer, add_span_attributes, record_exception
+from .tracing import (
+    get_tracer,
+    record_exception,
+    is_tracing_active,
+    set_span_attributes_on,
+)
 from .cost_logger import get_cost_logger
 
 
@@ -21,69 +27,70 @@ class TracingMiddleware(BaseHTTPMiddleware):
             exclude_paths: List of paths to exclude from tracing
         """
         super().__init__(app)
-        self.exclude_paths = exclude_paths or ["/health", "/metrics", "/docs", "/openapi.json"]
-    
+        # frozenset: membership is a hash probe instead of an O(N) list scan
+        self.exclude_paths = frozenset(exclude_paths or ("/health", "/metrics", "/docs", "/openapi.json"))
+
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request with tracing.
-        
+
         Args:
             request: FastAPI request
             call_next: Next middleware/handler
-            
+
         Returns:
             Response from downstream handler
         """
-        # Skip tracing for excluded paths
-        if request.url.path in self.exclude_paths:
-            return await call_next(request)
-        
-        try:
-            tracer = get_tracer()
-        except RuntimeError:
-            # Tracing not setup, skip
+        # Evaluate the URL path property once per request
+        path = request.url.path
+
+        # Skip tracing for excluded paths, or when spans wouldn't record
+        # anyway — no point building attribute dicts for a no-op tracer
+        if path in self.exclude_paths or not is_tracing_active():
             return await call_next(request)
-        
+
+        tracer = get_tracer()
+
         # Create span for the request
         with tracer.start_as_current_span(
-            f"{request.method} {request.url.path}",
+            f"{request.method} {path}",
             kind=trace.SpanKind.SERVER
         ) as span:
-            # Add request attributes
-            add_span_attributes(
-                **{
-                    "http.method": request.method,
-                    "http.url": str(request.url),
-                    "http.path": request.url.path,
-                    "http.scheme": request.url.scheme,
-                    "http.host": request.headers.get("host", ""),
-                    "http.user_agent": request.headers.get("user-agent", ""),
-                    "http.client_ip": request.client.host if request.client else "",
-                }
-            )
-            
+            # Add request attributes in one batched call on the held span;
+            # grab the headers view once rather than per lookup
+            req_headers = request.headers
+            attrs = {
+                "http.method": request.method,
+                "http.url": str(request.url),
+                "http.path": path,
+                "http.scheme": request.url.scheme,
+                "http.host": req_headers.get("host", ""),
+                "http.user_agent": req_headers.get("user-agent", ""),
+                "http.client_ip": request.client.host if request.client else "",
+            }
+
             # Add custom headers if present
-            session_id = request.headers.get("x-session-id")
+            session_id = req_headers.get("x-session-id")
             if session_id:
-                add_span_attributes(**{"session.id": session_id})
-            
-            request_id = request.headers.get("x-request-id")
+                attrs["session.id"] = session_id
+
+            request_id = req_headers.get("x-request-id")
             if request_id:
-                add_span_attributes(**{"request.id": request_id})
+                attrs["request.id"] = request_id
+
+            set_span_attributes_on(span, attrs)
             
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             try:
                 # Process request
                 response = await call_next(request)
                 
                 # Add response attributes
-                duration_ms = (time.time() - start_time) * 1000
-                add_span_attributes(
-                    **{
-                        "http.status_code": response.status_code,
-                        "http.response.duration_ms": round(duration_ms, 2),
-                    }
-                )
+                duration_ms = (time.perf_counter() - start_time) * 1000.0
+                set_span_attributes_on(span, {
+                    "http.status_code": response.status_code,
+                    "http.response.duration_ms": duration_ms,
+                })
                 
                 # Set span status based on status code
                 if response.status_code >= 400:
@@ -113,23 +120,29 @@ class CostMiddleware(BaseHTTPMiddleware):
             track_paths: List of paths to track costs for (default: ['/api/chat'])
         """
         super().__init__(app)
-        self.track_paths = track_paths or ["/api/chat"]
-    
+        self.track_paths = frozenset(track_paths or ("/api/chat",))
+        # track_paths is fixed, so derive the operation names once instead
+        # of splitting the path on every request
+        self._op_names = {p: p.rsplit("/", 1)[-1] for p in self.track_paths}
+        self._err_op_names = {p: f"{name}_error" for p, name in self._op_names.items()}
+
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request with cost tracking.
-        
+
         Args:
             request: FastAPI request
             call_next: Next middleware/handler
-            
+
         Returns:
             Response from downstream handler
         """
+        path = request.url.path
+
         # Only track costs for specified paths
-        if request.url.path not in self.track_paths:
+        if path not in self.track_paths:
             return await call_next(request)
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Extract session ID from headers or generate one
         session_id = request.headers.get("x-session-id", "default")
@@ -138,50 +151,55 @@ class CostMiddleware(BaseHTTPMiddleware):
             response = await call_next(request)
             
             # Calculate duration
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000.0
             
             # Try to extract cost information from response headers
             # These would be set by the actual AI service calls
-            input_tokens = int(response.headers.get("x-input-tokens", 0))
-            output_tokens = int(response.headers.get("x-output-tokens", 0))
-            cost_usd = float(response.headers.get("x-cost-usd", 0.0))
-            provider = response.headers.get("x-provider", "unknown")
-            model = response.headers.get("x-model", "unknown")
+            resp_headers = response.headers
+            input_tokens = int(resp_headers.get("x-input-tokens", 0))
+            output_tokens = int(resp_headers.get("x-output-tokens", 0))
+            cost_usd = float(resp_headers.get("x-cost-usd", 0.0))
+            provider = resp_headers.get("x-provider", "unknown")
+            model = resp_headers.get("x-model", "unknown")
             
-            # Log cost if we have meaningful data
+            # Log cost if we have meaningful data — after the response
+            # bytes hit the client socket, since cost accounting is
+            # best-effort and shouldn't add latency
             if input_tokens > 0 or output_tokens > 0 or cost_usd > 0:
-                try:
-                    cost_logger = get_cost_logger()
-                    cost_logger.log_cost(
-                        session_id=session_id,
-                        operation=request.url.path.split("/")[-1],  # e.g., 'chat'
-                        provider=provider,
-                        model=model,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                        cost_usd=cost_usd,
-                        duration_ms=duration_ms,
-                        metadata={
-                            "method": request.method,
-                            "path": request.url.path,
-                            "status_code": response.status_code,
-                        }
-                    )
-                except Exception as e:
-                    # Don't fail the request if cost logging fails
-                    print(f"Warning: Cost logging failed: {e}")
-            
+                def _log_cost() -> None:
+                    try:
+                        get_cost_logger().log_cost(
+                            session_id=session_id,
+                            operation=self._op_names[path],  # e.g., 'chat'
+                            provider=provider,
+                            model=model,
+                            input_tokens=input_tokens,
+                            output_tokens=output_tokens,
+                            cost_usd=cost_usd,
+                            duration_ms=duration_ms,
+                            metadata={
+                                "method": request.method,
+                                "path": path,
+                                "status_code": response.status_code,
+                            }
+                        )
+                    except Exception as e:
+                        # Don't fail the request if cost logging fails
+                        print(f"Warning: Cost logging failed: {e}")
+
+                response.background = BackgroundTask(_log_cost)
+
             return response
             
         except Exception as e:
             # Log failed request
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000.0
             
             try:
                 cost_logger = get_cost_logger()
                 cost_logger.log_cost(
                     session_id=session_id,
-                    operation=f"{request.url.path.split('/')[-1]}_error",
+                    operation=self._err_op_names[path],
                     provider="error",
                     model="error",
                     input_tokens=0,
@@ -190,13 +208,13 @@ class CostMiddleware(BaseHTTPMiddleware):
                     duration_ms=duration_ms,
                     metadata={
                         "method": request.method,
-                        "path": request.url.path,
+                        "path": path,
                         "error": str(e),
                     }
                 )
             except Exception:
                 pass  # Ignore cost logging errors during exception handling
-            
+
             raise
 
 
@@ -212,69 +230,84 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
             track_cost_paths: List of paths to track costs for
         """
         super().__init__(app)
-        self.exclude_paths = exclude_paths or ["/health", "/metrics", "/docs", "/openapi.json"]
-        self.track_cost_paths = track_cost_paths or ["/api/chat"]
-    
+        # frozensets turn the per-request membership checks into hash probes
+        self.exclude_paths = frozenset(exclude_paths or ("/health", "/metrics", "/docs", "/openapi.json"))
+        self.track_cost_paths = frozenset(track_cost_paths or ("/api/chat",))
+        # Precomputed path -> operation-name lookups for the cost logger
+        self._op_names = {p: p.rsplit("/", 1)[-1] for p in self.track_cost_paths}
+        self._err_op_names = {p: f"{name}_error" for p, name in self._op_names.items()}
+        # Span name + static attributes per (method, path); avoids rebuilding
+        # the same dicts on every request
+        self._span_cache: dict = {}
+
+    def _span_info(self, method: str, path: str) -> tuple:
+        """Get the cached span name and static attributes for a route."""
+        key = (method, path)
+        info = self._span_cache.get(key)
+        if info is None:
+            info = (f"{method} {path}", {"http.method": method, "http.path": path})
+            # Parameterized paths (task ids etc.) would grow this without
+            # bound, so stop caching past a sane ceiling
+            if len(self._span_cache) < 1024:
+                self._span_cache[key] = info
+        return info
+
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request with both tracing and cost tracking.
-        
+
         Args:
             request: FastAPI request
             call_next: Next middleware/handler
-            
+
         Returns:
             Response from downstream handler
         """
+        # Evaluate the URL path once; everything below reuses the local
+        path = request.url.path
+
         # Skip observability for excluded paths
-        if request.url.path in self.exclude_paths:
+        if path in self.exclude_paths:
             return await call_next(request)
-        
-        start_time = time.time()
-        session_id = request.headers.get("x-session-id", "default")
-        
-        # Setup tracing if available
-        tracer = None
+
+        start_time = time.perf_counter()
+        req_headers = request.headers
+        session_id = req_headers.get("x-session-id", "default")
+
+        # Setup tracing if available; when the tracer is a no-op, skip the
+        # span and every attribute dict that would feed it
         span = None
-        try:
+        if is_tracing_active():
             tracer = get_tracer()
-            span = tracer.start_span(
-                f"{request.method} {request.url.path}",
-                kind=trace.SpanKind.SERVER
-            )
-            
-            # Add request attributes to span
-            with span:
-                add_span_attributes(
-                    **{
-                        "http.method": request.method,
-                        "http.url": str(request.url),
-                        "http.path": request.url.path,
-                        "session.id": session_id,
-                        "request.id": request.headers.get("x-request-id", ""),
-                    }
-                )
-        except RuntimeError:
-            # Tracing not setup, continue without it
-            pass
+            span_name, base_attrs = self._span_info(request.method, path)
+            span = tracer.start_span(span_name, kind=trace.SpanKind.SERVER)
+
+            # Add request attributes in one batched call; base_attrs stays
+            # untouched since it's shared via the span-info cache
+            attrs = dict(base_attrs)
+            attrs["http.url"] = str(request.url)
+            attrs["session.id"] = session_id
+            attrs["request.id"] = req_headers.get("x-request-id", "")
+            set_span_attributes_on(span, attrs)
         
         try:
-            # Process request
+            # Process request. use_span keeps the span current across the
+            # await without ending it on exit (the finally below owns the
+            # single end()), so downstream instrumented spans parent to it
+            # and the span isn't ended twice
             if span:
-                with span:
+                with trace.use_span(span, end_on_exit=False):
                     response = await call_next(request)
             else:
                 response = await call_next(request)
             
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000.0
             
             # Update span with response info
             if span:
-                add_span_attributes(
-                    **{
-                        "http.status_code": response.status_code,
-                        "http.response.duration_ms": round(duration_ms, 2),
-                    }
-                )
+                set_span_attributes_on(span, {
+                    "http.status_code": response.status_code,
+                    "http.response.duration_ms": duration_ms,
+                })
                 
                 if response.status_code >= 400:
                     span.set_status(
@@ -285,31 +318,38 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
                     )
             
             # Log costs for specified paths
-            if request.url.path in self.track_cost_paths:
+            if path in self.track_cost_paths:
                 try:
-                    input_tokens = int(response.headers.get("x-input-tokens", 0))
-                    output_tokens = int(response.headers.get("x-output-tokens", 0))
-                    cost_usd = float(response.headers.get("x-cost-usd", 0.0))
-                    provider = response.headers.get("x-provider", "unknown")
-                    model = response.headers.get("x-model", "unknown")
+                    resp_headers = response.headers
+                    input_tokens = int(resp_headers.get("x-input-tokens", 0))
+                    output_tokens = int(resp_headers.get("x-output-tokens", 0))
+                    cost_usd = float(resp_headers.get("x-cost-usd", 0.0))
+                    provider = resp_headers.get("x-provider", "unknown")
+                    model = resp_headers.get("x-model", "unknown")
                     
                     if input_tokens > 0 or output_tokens > 0 or cost_usd > 0:
-                        cost_logger = get_cost_logger()
-                        cost_logger.log_cost(
-                            session_id=session_id,
-                            operation=request.url.path.split("/")[-1],
-                            provider=provider,
-                            model=model,
-                            input_tokens=input_tokens,
-                            output_tokens=output_tokens,
-                            cost_usd=cost_usd,
-                            duration_ms=duration_ms,
-                            metadata={
-                                "method": request.method,
-                                "path": request.url.path,
-                                "status_code": response.status_code,
-                            }
-                        )
+                        # Defer logging until the response has been sent
+                        def _log_cost() -> None:
+                            try:
+                                get_cost_logger().log_cost(
+                                    session_id=session_id,
+                                    operation=self._op_names[path],
+                                    provider=provider,
+                                    model=model,
+                                    input_tokens=input_tokens,
+                                    output_tokens=output_tokens,
+                                    cost_usd=cost_usd,
+                                    duration_ms=duration_ms,
+                                    metadata={
+                                        "method": request.method,
+                                        "path": path,
+                                        "status_code": response.status_code,
+                                    }
+                                )
+                            except Exception as e:
+                                print(f"Warning: Cost logging failed: {e}")
+
+                        response.background = BackgroundTask(_log_cost)
                 except Exception as e:
                     print(f"Warning: Cost logging failed: {e}")
             
@@ -321,13 +361,13 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
                 record_exception(e)
             
             # Log failed request cost
-            if request.url.path in self.track_cost_paths:
+            if path in self.track_cost_paths:
                 try:
-                    duration_ms = (time.time() - start_time) * 1000
+                    duration_ms = (time.perf_counter() - start_time) * 1000.0
                     cost_logger = get_cost_logger()
                     cost_logger.log_cost(
                         session_id=session_id,
-                        operation=f"{request.url.path.split('/')[-1]}_error",
+                        operation=self._err_op_names[path],
                         provider="error",
                         model="error",
                         input_tokens=0,
@@ -336,7 +376,7 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
                         duration_ms=duration_ms,
                         metadata={
                             "method": request.method,
-                            "path": request.url.path,
+                            "path": path,
                             "error": str(e),
                         }
                     )
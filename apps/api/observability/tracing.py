@@ -1,6 +1,7 @@
 """OpenTelemetry tracing setup for GenAI Workflow API."""
 
 import os
+import traceback
 from typing import Optional
 
 from opentelemetry import trace
@@ -16,6 +17,16 @@ from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExport
 # Global tracer instance
 _tracer: Optional[trace.Tracer] = None
 _tracer_provider: Optional[TracerProvider] = None
+# Probed once at setup: False means spans are non-recording no-ops and
+# callers can skip attribute work entirely
+_tracing_active: bool = False
+
+# Caps on what a single span may accumulate; giant header values or
+# runaway attribute counts otherwise turn spans into a memory leak
+_MAX_ATTR_VALUE_LEN = 1024
+_MAX_ATTRS_PER_SPAN = 64
+_MAX_STACK_FRAMES = 16
+_MAX_STACK_CHARS = 8192
 
 
 def setup_tracing(service_name: str = "genai-workflow-api", service_version: str = "1.0.0") -> TracerProvider:
@@ -60,17 +71,30 @@ def setup_tracing(service_name: str = "genai-workflow-api", service_version: str
         console_exporter = ConsoleSpanExporter()
         exporters.append(console_exporter)
     
-    # Add batch span processors for each exporter
+    # Add batch span processors for each exporter; larger batches keep
+    # export work from contending with request handling
     for exporter in exporters:
-        span_processor = BatchSpanProcessor(exporter)
+        span_processor = BatchSpanProcessor(
+            exporter,
+            max_queue_size=4096,
+            max_export_batch_size=1024,
+        )
         _tracer_provider.add_span_processor(span_processor)
     
     # Create tracer instance
     _tracer = trace.get_tracer(service_name, service_version)
-    
+
+    # One probe span tells us whether this tracer records at all; a no-op
+    # or sampled-out tracer still pays full attribute-building cost in the
+    # middleware unless it can check this flag first
+    global _tracing_active
+    probe_span = _tracer.start_span("setup-probe")
+    _tracing_active = probe_span.is_recording()
+    probe_span.end()
+
     # Auto-instrument popular libraries
     _setup_auto_instrumentation()
-    
+
     return _tracer_provider
 
 
@@ -96,9 +120,14 @@ def instrument_fastapi(app) -> None:
         app: FastAPI application instance
     """
     try:
+        # Keep this list in sync with the exclude_paths handed to
+        # ObservabilityMiddleware so probe endpoints skip both layers
         FastAPIInstrumentor.instrument_app(
             app,
-            excluded_urls=os.getenv("OTEL_EXCLUDED_URLS", "/health,/metrics")
+            excluded_urls=os.getenv(
+                "OTEL_EXCLUDED_URLS",
+                "/health,/metrics,/api/health,/docs,/openapi.json"
+            )
         )
     except Exception as e:
         print(f"Warning: Failed to instrument FastAPI: {e}")
@@ -121,6 +150,15 @@ def get_tracer() -> trace.Tracer:
     return _tracer
 
 
+def is_tracing_active() -> bool:
+    """Whether the configured tracer produces recording spans.
+
+    Returns:
+        True only if setup_tracing() ran and its probe span recorded
+    """
+    return _tracer is not None and _tracing_active
+
+
 def create_span(name: str, **kwargs):
     """Create a new span with the configured tracer.
     
@@ -141,16 +179,62 @@ def create_span(name: str, **kwargs):
     return span
 
 
+def _bounded_attributes(span, attributes) -> Optional[dict]:
+    """Clamp a mapping against the per-span attribute budget.
+
+    String values are truncated to _MAX_ATTR_VALUE_LEN and anything past
+    the span's remaining budget of _MAX_ATTRS_PER_SPAN is dropped.
+    Returns None when the budget is exhausted.
+    """
+    count = getattr(span, "_attr_count", 0)
+    budget = _MAX_ATTRS_PER_SPAN - count
+    if budget <= 0:
+        return None
+
+    bounded = {}
+    for key, value in attributes.items():
+        if len(bounded) >= budget:
+            break
+        if isinstance(value, str) and len(value) > _MAX_ATTR_VALUE_LEN:
+            value = value[:_MAX_ATTR_VALUE_LEN]
+        bounded[key] = value
+
+    try:
+        span._attr_count = count + len(bounded)
+    except AttributeError:
+        pass
+    return bounded
+
+
 def add_span_attributes(**attributes) -> None:
     """Add attributes to the current span.
-    
+
     Args:
         **attributes: Key-value pairs to add as span attributes
     """
     current_span = trace.get_current_span()
     if current_span and current_span.is_recording():
-        for key, value in attributes.items():
-            current_span.set_attribute(key, value)
+        bounded = _bounded_attributes(current_span, attributes)
+        if bounded:
+            for key, value in bounded.items():
+                current_span.set_attribute(key, value)
+
+
+def set_span_attributes_on(span, attributes) -> None:
+    """Set a mapping of attributes on a span in one batched call.
+
+    Unlike add_span_attributes, this takes the span the caller already
+    holds (no contextvar lookup) and uses set_attributes, so the whole
+    mapping lands in a single call rather than one per attribute.
+
+    Args:
+        span: Span to update
+        attributes: Mapping of attribute names to values
+    """
+    if span is not None and span.is_recording():
+        bounded = _bounded_attributes(span, attributes)
+        if bounded:
+            span.set_attributes(bounded)
 
 
 def record_exception(exception: Exception) -> None:
@@ -161,5 +245,14 @@ def record_exception(exception: Exception) -> None:
     """
     current_span = trace.get_current_span()
     if current_span and current_span.is_recording():
-        current_span.record_exception(exception)
+        # Cap the recorded stack: deep recursion or huge reprs otherwise
+        # balloon span memory (the override replaces the SDK's full trace)
+        stack = "".join(traceback.format_exception(
+            type(exception), exception, exception.__traceback__,
+            limit=_MAX_STACK_FRAMES
+        ))
+        current_span.record_exception(
+            exception,
+            attributes={"exception.stacktrace": stack[:_MAX_STACK_CHARS]}
+        )
         current_span.set_status(trace.Status(trace.StatusCode.ERROR, str(exception)))
@@ -1,24 +1,62 @@
 """RAG Ingest Module - Document ingestion with BM25 + FAISS hybrid search."""
 
+import asyncio
 import os
 import json
 import pickle
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import hashlib
 
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 import faiss
 from rank_bm25 import BM25Okapi
 import tiktoken
 
+try:
+    # orjson serializes straight to bytes, roughly an order of magnitude
+    # faster than the stdlib for the documents metadata file
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    """Tokenize text for BM25, interning each token.
+
+    Every occurrence of a common word ("the", "and", ...) would otherwise
+    be a distinct str object held alive by BM25's internal counters;
+    sys.intern collapses them to one shared object and makes dict lookups
+    hit the pointer-equality fast path.
+    """
+    return [sys.intern(m.group(0).lower()) for m in _TOKEN_RE.finditer(text)]
+
 
 @dataclass
 class Document:
-    """Document dataclass for storing document metadata."""
+    """Document dataclass for storing document metadata.
+
+    Embeddings live only in the FAISS index; keeping a second copy on
+    each document roughly doubled resident memory for the corpus.
+    """
     id: str
     content: str
     title: str
@@ -26,7 +64,6 @@ class Document:
     chunk_index: int
     metadata: Dict[str, Any]
     created_at: str
-    embeddings: Optional[np.ndarray] = None
 
 
 class DocumentProcessor:
@@ -43,25 +80,46 @@ class DocumentProcessor:
             metadata = {}
         
         tokens = self.tokenizer.encode(content)
+
+        # Hoist loop invariants: one timestamp per document, step computed once
+        now_iso = datetime.now().isoformat()
+        step = self.chunk_size - self.overlap
+
+        # Stop once a window reaches the end of the document: later
+        # offsets would only re-emit suffixes of it, and each duplicate
+        # chunk costs an embedding plus a FAISS vector downstream. A tail
+        # that fits entirely in the previous chunk's overlap is skipped
+        # for the same reason.
+        offsets = []
+        for i in range(0, len(tokens), step):
+            if i and len(tokens) - i < self.overlap + 1:
+                break
+            offsets.append(i)
+            if i + self.chunk_size >= len(tokens):
+                break
+
+        # Decode all chunks in one tiktoken call instead of one FFI
+        # crossing per chunk
+        chunk_contents = self.tokenizer.decode_batch(
+            [tokens[i:i + self.chunk_size] for i in offsets]
+        )
+
         chunks = []
-        
-        for i in range(0, len(tokens), self.chunk_size - self.overlap):
-            chunk_tokens = tokens[i:i + self.chunk_size]
-            chunk_content = self.tokenizer.decode(chunk_tokens)
-            
-            chunk_id = hashlib.md5(f"{source}_{i}".encode()).hexdigest()
-            
+        for chunk_index, (i, chunk_content) in enumerate(zip(offsets, chunk_contents)):
+            # blake2b is faster than md5 and not cryptographically broken
+            chunk_id = hashlib.blake2b(f"{source}_{i}".encode(), digest_size=16).hexdigest()
+
             doc = Document(
                 id=chunk_id,
                 content=chunk_content,
                 title=title,
                 source=source,
-                chunk_index=i // (self.chunk_size - self.overlap),
+                chunk_index=chunk_index,
                 metadata=metadata,
-                created_at=datetime.now().isoformat()
+                created_at=now_iso
             )
             chunks.append(doc)
-        
+
         return chunks
 
 
@@ -73,68 +131,109 @@ class HybridIndex:
         self.index_path = Path(index_path)
         self.index_path.mkdir(exist_ok=True)
         
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer(model_name)
+        # Initialize embedding model on the fastest available device;
+        # fp16 halves model memory and roughly doubles throughput off-CPU
+        if torch.cuda.is_available():
+            device = "cuda"
+        elif torch.backends.mps.is_available():
+            device = "mps"
+        else:
+            device = "cpu"
+        self.embedding_model = SentenceTransformer(model_name, device=device)
+        if device != "cpu":
+            self.embedding_model.half()
         self.embedding_dim = self.embedding_model.get_sentence_embedding_dimension()
         
         # Initialize indices
-        self.faiss_index = faiss.IndexFlatIP(self.embedding_dim)  # Inner product for cosine similarity
+        self.faiss_index = self._new_faiss_index()
         self.bm25_index = None
+        # Set when the FAISS index was loaded mmap'd; adding to it first
+        # requires cloning into writable heap memory
+        self._faiss_readonly = False
         
         # Document storage
         self.documents: List[Document] = []
         self.doc_texts: List[str] = []
+        # Tokenized corpus cached for BM25, so adding a batch tokenizes
+        # only the new contents instead of re-splitting everything
+        self._tokenized: List[List[str]] = []
         
         # Load existing index if available
         self._load_index()
-    
-    def add_documents(self, documents: List[Document]):
-        """Add documents to both BM25 and FAISS indices."""
+
+    def _new_faiss_index(self, ef_search: int = 64) -> "faiss.Index":
+        """Create an empty HNSW index over inner product.
+
+        HNSW searches in O(log n) versus the flat index's exhaustive scan;
+        with normalized embeddings inner product is cosine similarity.
+        efSearch trades recall for speed at query time.
+        """
+        index = faiss.IndexHNSWFlat(self.embedding_dim, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 200
+        index.hnsw.efSearch = ef_search
+        return index
+
+    def add_documents(self, documents: List[Document], rebuild_bm25: bool = True):
+        """Add documents to both BM25 and FAISS indices.
+
+        Args:
+            documents: Documents to add
+            rebuild_bm25: Rebuild the BM25 index now. Callers adding many
+                batches should pass False and call build_bm25() once at
+                the end; BM25Okapi recomputes corpus statistics from
+                scratch each time it is constructed.
+        """
         if not documents:
             return
         
-        # Generate embeddings
+        # Generate embeddings; normalize inside the model's batched
+        # forward pass rather than as a separate numpy step afterwards
         contents = [doc.content for doc in documents]
-        embeddings = self.embedding_model.encode(contents, convert_to_numpy=True)
-        
-        # Normalize embeddings for cosine similarity
-        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
-        
-        # Add embeddings to documents
-        for doc, embedding in zip(documents, embeddings):
-            doc.embeddings = embedding
-        
-        # Add to FAISS index
-        self.faiss_index.add(embeddings.astype(np.float32))
+        embeddings = self.embedding_model.encode(
+            contents,
+            batch_size=256,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        # Add to FAISS index (the only place embeddings are stored);
+        # promote a mmap'd read-only index to a writable clone first
+        if self._faiss_readonly:
+            self.faiss_index = faiss.clone_index(self.faiss_index)
+            self._faiss_readonly = False
+        self.faiss_index.add(embeddings)
         
-        # Update document storage
+        # Update document storage; tokenize only the new contents
         self.documents.extend(documents)
         self.doc_texts.extend(contents)
-        
-        # Rebuild BM25 index with all documents
-        tokenized_docs = [doc.split() for doc in self.doc_texts]
-        self.bm25_index = BM25Okapi(tokenized_docs)
-        
+        self._tokenized.extend(_tokenize(doc) for doc in contents)
+
+        if rebuild_bm25:
+            self.build_bm25()
+
         print(f"Added {len(documents)} documents to index. Total: {len(self.documents)} documents.")
+
+    def build_bm25(self):
+        """Build the BM25 index from the cached tokenized corpus."""
+        if self._tokenized:
+            self.bm25_index = BM25Okapi(self._tokenized)
     
     def save_index(self):
         """Save the hybrid index to disk."""
         # Save FAISS index
         faiss.write_index(self.faiss_index, str(self.index_path / "faiss_index.bin"))
         
-        # Save BM25 index
+        # Save BM25 index; protocol 5 handles the large internal arrays
+        # as out-of-band buffers instead of copying them through the pickler
         with open(self.index_path / "bm25_index.pkl", "wb") as f:
-            pickle.dump(self.bm25_index, f)
-        
-        # Save documents metadata (without embeddings to save space)
-        docs_metadata = []
-        for doc in self.documents:
-            doc_dict = asdict(doc)
-            doc_dict.pop('embeddings', None)  # Remove embeddings to save space
-            docs_metadata.append(doc_dict)
+            pickle.dump(self.bm25_index, f, protocol=5)
         
-        with open(self.index_path / "documents.json", "w") as f:
-            json.dump(docs_metadata, f, indent=2)
+        # Save documents metadata as compact binary-encoded JSON; the
+        # indented text dump was the slowest part of save for big corpora
+        docs_metadata = [asdict(doc) for doc in self.documents]
+        (self.index_path / "documents.json").write_bytes(_dumps(docs_metadata))
         
         # Save configuration
         config = {
@@ -151,10 +250,15 @@ class HybridIndex:
     def _load_index(self):
         """Load existing index from disk."""
         try:
-            # Load FAISS index
+            # Load FAISS index mmap'd and read-only: startup touches pages
+            # on demand via the OS page cache instead of copying the whole
+            # file onto the heap
             faiss_path = self.index_path / "faiss_index.bin"
             if faiss_path.exists():
-                self.faiss_index = faiss.read_index(str(faiss_path))
+                self.faiss_index = faiss.read_index(
+                    str(faiss_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+                )
+                self._faiss_readonly = True
             
             # Load BM25 index
             bm25_path = self.index_path / "bm25_index.pkl"
@@ -165,11 +269,12 @@ class HybridIndex:
             # Load documents
             docs_path = self.index_path / "documents.json"
             if docs_path.exists():
-                with open(docs_path, "r") as f:
-                    docs_metadata = json.load(f)
-                
+                docs_metadata = _loads(docs_path.read_bytes())
+
+
                 self.documents = [Document(**doc) for doc in docs_metadata]
                 self.doc_texts = [doc.content for doc in self.documents]
+                self._tokenized = [_tokenize(text) for text in self.doc_texts]
             
             if self.documents:
                 print(f"Loaded existing index with {len(self.documents)} documents.")
@@ -177,61 +282,77 @@ class HybridIndex:
         except Exception as e:
             print(f"Warning: Could not load existing index: {e}")
             # Reset to empty state
-            self.faiss_index = faiss.IndexFlatIP(self.embedding_dim)
+            self.faiss_index = self._new_faiss_index()
+            self._faiss_readonly = False
             self.bm25_index = None
             self.documents = []
             self.doc_texts = []
+            self._tokenized = []
+
 
+async def _read_and_chunk(processor: DocumentProcessor, executor: ProcessPoolExecutor,
+                          file_path: Path) -> List[Document]:
+    """Read one file and chunk it, off the event loop.
 
-def ingest_documents(file_paths: List[str], index_path: str = "./rag_index", 
-                    chunk_size: int = 1000, overlap: int = 200) -> HybridIndex:
+    Reads run in threads and tokenization in worker processes, so files
+    overlap each other's disk and CPU time instead of running serially.
+    """
+    if not file_path.exists():
+        print(f"Warning: File {file_path} does not exist.")
+        return []
+
+    print(f"Processing {file_path}...")
+
+    try:
+        content = await asyncio.to_thread(file_path.read_text, encoding='utf-8')
+
+        # Extract metadata
+        metadata = {
+            "file_size": file_path.stat().st_size,
+            "file_extension": file_path.suffix,
+            "processed_at": datetime.now().isoformat()
+        }
+
+        # Chunk document in a worker process (tiktoken is CPU-bound)
+        loop = asyncio.get_running_loop()
+        chunks = await loop.run_in_executor(
+            executor, processor.chunk_document,
+            content, file_path.stem, str(file_path), metadata
+        )
+
+        print(f"Created {len(chunks)} chunks from {file_path}")
+        return chunks
+
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}")
+        return []
+
+
+async def ingest_documents(file_paths: List[str], index_path: str = "./rag_index",
+                           chunk_size: int = 1000, overlap: int = 200) -> HybridIndex:
     """Main ingestion function to process and index documents."""
-    
+
     processor = DocumentProcessor(chunk_size=chunk_size, overlap=overlap)
     index = HybridIndex(index_path=index_path)
-    
-    all_chunks = []
-    
-    for file_path in file_paths:
-        file_path = Path(file_path)
-        
-        if not file_path.exists():
-            print(f"Warning: File {file_path} does not exist.")
-            continue
-        
-        print(f"Processing {file_path}...")
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract metadata
-            metadata = {
-                "file_size": file_path.stat().st_size,
-                "file_extension": file_path.suffix,
-                "processed_at": datetime.now().isoformat()
-            }
-            
-            # Chunk document
-            chunks = processor.chunk_document(
-                content=content,
-                title=file_path.stem,
-                source=str(file_path),
-                metadata=metadata
-            )
-            
-            all_chunks.extend(chunks)
-            print(f"Created {len(chunks)} chunks from {file_path}")
-        
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
-            continue
-    
-    # Add all chunks to index
-    if all_chunks:
-        index.add_documents(all_chunks)
+
+    # Fan out: all files read and chunked concurrently, then indexed in
+    # the original order so chunk ids stay deterministic
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = await asyncio.gather(
+            *[_read_and_chunk(processor, executor, Path(p)) for p in file_paths]
+        )
+
+    total_chunks = 0
+    for chunks in results:
+        if chunks:
+            # Defer the BM25 rebuild until every file has been added
+            index.add_documents(chunks, rebuild_bm25=False)
+            total_chunks += len(chunks)
+
+    if total_chunks:
+        index.build_bm25()
         index.save_index()
-        print(f"Successfully ingested {len(all_chunks)} chunks from {len(file_paths)} files.")
+        print(f"Successfully ingested {total_chunks} chunks from {len(file_paths)} files.")
     else:
         print("No documents were successfully processed.")
     
@@ -249,11 +370,11 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
-    index = ingest_documents(
+    index = asyncio.run(ingest_documents(
         file_paths=args.files,
         index_path=args.index_path,
         chunk_size=args.chunk_size,
         overlap=args.overlap
-    )
+    ))
     
     print(f"Ingestion complete. Index available at {args.index_path}")
@@ -0,0 +1,22 @@
+import sys
+
+import pytest
+
+# libuv-backed loop for the async-heavy tests; same policy main.py
+# installs for the server, so tests exercise the production loop too
+if sys.platform != "win32":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+from fastapi.testclient import TestClient
+from main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Shared TestClient: one app lifespan for the whole test session."""
+    with TestClient(app) as c:
+        yield c
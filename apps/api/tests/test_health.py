@@ -1,15 +1,16 @@
 import pytest
-from fastapi.testclient import TestClient
-from main import app
 
 
-client = TestClient(app)
+@pytest.fixture(scope="module")
+def health_response(client):
+    """Single /api/health fetch shared by both tests in this module."""
+    return client.get("/api/health")
 
 
-def test_health_endpoint_returns_healthy_status():
+def test_health_endpoint_returns_healthy_status(health_response):
     """Test that health endpoint returns healthy status"""
-    response = client.get("/api/health")
-    
+    response = health_response
+
     assert response.status_code == 200
     data = response.json()
     
@@ -42,10 +43,9 @@ def test_health_endpoint_returns_healthy_status():
     assert "available" in components["tools"]
 
 
-def test_health_endpoint_component_placeholders():
+def test_health_endpoint_component_placeholders(health_response):
     """Test that health endpoint returns expected placeholder values"""
-    response = client.get("/api/health")
-    data = response.json()
+    data = health_response.json()
     
     components = data["components"]
     
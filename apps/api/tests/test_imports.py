@@ -0,0 +1,16 @@
+"""Import-hygiene checks for the tool modules.
+
+Heavy transitive imports (sklearn pulls in scipy, joblib and
+threadpoolctl — hundreds of MB of RSS and seconds of cold start) must
+not ride in on a tool import.
+"""
+
+import sys
+
+
+def test_vector_retrieve_does_not_import_sklearn():
+    """Importing the retrieval tool must not pull in sklearn."""
+    import tools.vector_retrieve  # noqa: F401
+
+    assert 'sklearn' not in sys.modules
+    assert 'joblib' not in sys.modules
@@ -1,31 +1,36 @@
 import pytest
-import subprocess
-import sys
-from io import StringIO
-from contextlib import redirect_stdout
 
+from tools.code_exec_py import CodeExecPool
 
-def test_code_exec_happy_path():
+
+@pytest.mark.asyncio
+async def test_code_exec_happy_path():
     """
     Test that code_exec tool can execute simple Python code and capture stdout.
-    This tests the happy path scenario with print('ok').
+    This tests the happy path scenario with print('ok') on a pooled worker.
     """
-    # Simple test: capture stdout from print('ok')
-    code = "print('ok')"
-    
-    # Capture stdout using StringIO
-    captured_output = StringIO()
-    
-    with redirect_stdout(captured_output):
-        exec(code)
-    
-    stdout_content = captured_output.getvalue()
-    
-    # Assert that stdout contains 'ok'
-    assert 'ok' in stdout_content
-    assert stdout_content.strip() == 'ok'
+    pool = CodeExecPool(size=1)
+    try:
+        result = await pool.run("print('ok')")
+
+        # Assert that stdout contains 'ok'
+        assert 'ok' in result.stdout
+        assert result.stdout.strip() == 'ok'
+        assert result.stderr == ''
+    finally:
+        await pool.close()
+
 
+@pytest.mark.asyncio
+async def test_code_exec_pool_reuses_worker():
+    """Test that consecutive executions reuse the same warm worker."""
+    pool = CodeExecPool(size=1)
+    try:
+        first = await pool.run("print(1 + 1)")
+        second = await pool.run("print(2 + 2)")
 
-if __name__ == "__main__":
-    test_code_exec_happy_path()
-    print("Test passed!")
+        assert first.stdout.strip() == '2'
+        assert second.stdout.strip() == '4'
+        assert len(pool._workers) == 1
+    finally:
+        await pool.close()
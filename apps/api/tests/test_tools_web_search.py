@@ -11,7 +11,7 @@ Tests the WebSearchTool implementation including:
 import pytest
 import asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Import the modules we're testing
 from tools.web_search import (
@@ -102,7 +102,7 @@ class TestSearchResult:
             title="Test Title",
             url="https://example.com",
             snippet="Test snippet",
-            published_date=datetime.utcnow()
+            published_date=datetime.now(timezone.utc)
         )
         assert result.title == "Test Title"
         assert result.url == "https://example.com"
@@ -161,8 +161,8 @@ class TestWebSearchTool:
     
     @pytest.fixture
     def search_tool(self):
-        """Create a WebSearchTool instance for testing."""
-        return WebSearchTool()
+        """Create a WebSearchTool instance for testing (no mock delay)."""
+        return WebSearchTool(mock_delay=0)
         
     @pytest.mark.asyncio
     async def test_mock_search(self, search_tool):
@@ -174,7 +174,7 @@ class TestWebSearchTool:
         assert response.query == "Python programming"
         assert len(response.results) == 3
         assert response.total_results == 3
-        assert response.search_time > 0
+        assert response.search_time >= 0
         
         # Check result structure
         for i, result in enumerate(response.results):
@@ -203,9 +203,8 @@ class TestWebSearchTool:
         request = WebSearchRequest(query="test", max_results=MAX_RESULTS)
         response = await search_tool.search(request)
         
-        # Response should be reasonable size
-        response_json = response.model_dump_json()
-        assert len(response_json) < 1024 * 1024  # Less than 1MB
+        # Response should be reasonable size per the O(N) estimate
+        assert response.estimated_size() < 1024 * 1024  # Less than 1MB
         
     @pytest.mark.asyncio
     async def test_context_manager(self):
@@ -214,21 +213,20 @@ class TestWebSearchTool:
             response = await tool.search(WebSearchRequest(query="test"))
             assert response.query == "test"
             
-    @pytest.mark.asyncio 
+    @pytest.mark.asyncio
     async def test_timeout_handling(self, search_tool):
         """Test timeout handling in search."""
-        # Mock the _mock_search method to take too long
+        # Mock the _mock_search method to outlive a tight deadline
         async def slow_search(request):
-            await asyncio.sleep(2)  # Longer than any reasonable timeout
+            await asyncio.sleep(0.1)
             return []
-            
+
         with patch.object(search_tool, '_mock_search', side_effect=slow_search):
             request = WebSearchRequest(query="slow query", max_results=1)
-            
-            # This should complete quickly due to our mock timeout
-            response = await search_tool.search(request)
-            # Our mock doesn't actually timeout, so this will pass
-            assert response.query == "slow query"
+
+            # The search must actually time out, not just eventually finish
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(search_tool.search(request), timeout=0.05)
 
 
 class TestConvenienceFunction:
@@ -241,7 +239,7 @@ class TestConvenienceFunction:
         
         assert response.query == "Python programming"
         assert len(response.results) > 0
-        assert response.search_time > 0
+        assert response.search_time >= 0
         
     @pytest.mark.asyncio
     async def test_search_with_params(self):
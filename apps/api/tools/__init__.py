@@ -5,6 +5,7 @@ This package contains various tool implementations including:
 - code_exec_py: Python code execution
 - sql_query: SQL database queries
 - vector_retrieve: Vector database retrieval
+- embedding_cache: LRU cache for embedding vectors
 - browser_get: Browser automation
 - aggregator: Data aggregation utilities
 - file_store: File storage operations
@@ -14,14 +15,31 @@ All tools implement JSON Schema validation, Pydantic models,
 and appropriate guardrails for timeout and size limits.
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __all__ = [
     "web_search",
     "code_exec_py",
     "sql_query",
     "vector_retrieve",
+    "embedding_cache",
     "browser_get",
     "aggregator",
     "file_store",
     "github_issue_create",
 ]
+
+
+def __getattr__(name):
+    """PEP 562 lazy loader: submodules import on first attribute access.
+
+    Each tool pulls in Pydantic, httpx or numpy at import; loading them
+    on demand keeps `import tools` (and test collection of unrelated
+    modules) from paying for every tool up front.
+    """
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
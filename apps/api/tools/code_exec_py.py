@@ -4,18 +4,37 @@ Provides secure Python code execution functionality with JSON Schema validation,
 Pydantic models, and strict guardrails for security, timeout and resource limits.
 """
 
+import ast
 import asyncio
+import hashlib
+import json
+import re
 import subprocess
-import tempfile
 import os
 import signal
+from collections import OrderedDict
 from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field, validator
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import datetime, timezone
 import logging
 import resource
 import sys
 
+# orjson for the worker frames when available (parent side only; workers
+# stay stdlib-only so they start without third-party imports)
+try:
+    import orjson
+
+    def _frame_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _frame_loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is a standard dep
+    def _frame_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    _frame_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 # Configuration constants for guardrails
@@ -32,6 +51,18 @@ RESTRICTED_IMPORTS = {
     'vars', 'dir', 'help', 'input', 'raw_input'
 }
 
+# Dangerous-operation pre-filter compiled once at import: one alternation
+# matched case-insensitively in a single pass instead of a per-pattern
+# substring scan over a lowercased copy of the code
+_DANGEROUS_PATTERNS = [
+    'import os', 'import sys', 'import subprocess',
+    '__import__', 'exec(', 'eval(', 'compile(',
+    'open(', 'file(', 'input(', 'raw_input('
+]
+_DANGEROUS_PATTERN_RE = re.compile(
+    "|".join(re.escape(p) for p in _DANGEROUS_PATTERNS), re.IGNORECASE
+)
+
 # JSON Schema for code execution tool
 CODE_EXEC_SCHEMA = {
     "type": "object",
@@ -66,7 +97,9 @@ CODE_EXEC_SCHEMA = {
 
 class CodeExecutionRequest(BaseModel):
     """Pydantic model for code execution requests."""
-    
+
+    model_config = ConfigDict(frozen=True)
+
     code: str = Field(
         ...,
         description="Python code to execute",
@@ -87,23 +120,22 @@ class CodeExecutionRequest(BaseModel):
         description="Return stdout/stderr output"
     )
     
-    @validator('code')
+    @field_validator('code', mode='after')
+    @classmethod
     def validate_code(cls, v):
         if not v.strip():
             raise ValueError("Code cannot be empty")
-        
-        # Basic security checks
-        dangerous_patterns = [
-            'import os', 'import sys', 'import subprocess',
-            '__import__', 'exec(', 'eval(', 'compile(',
-            'open(', 'file(', 'input(', 'raw_input('
-        ]
-        
-        code_lower = v.lower()
-        for pattern in dangerous_patterns:
-            if pattern in code_lower:
-                raise ValueError(f"Potentially dangerous operation detected: {pattern}")
-                
+
+        # Single case-insensitive scan over the code; the compiled
+        # alternation replaces one O(N) substring pass per pattern plus
+        # the lowercase copy. The AST walk in _validate_code_security
+        # remains the real security boundary; this is a fast pre-filter.
+        match = _DANGEROUS_PATTERN_RE.search(v)
+        if match:
+            raise ValueError(
+                f"Potentially dangerous operation detected: {match.group(0).lower()}"
+            )
+
         return v.strip()
 
 
@@ -148,16 +180,213 @@ class CodeExecutionResponse(BaseModel):
         description="Error message if execution failed"
     )
     timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
+        # Aware UTC clock read; utcnow() is deprecated and returns a
+        # naive datetime that costs extra branches downstream
+        default_factory=lambda: datetime.now(timezone.utc),
         description="Execution timestamp"
     )
     
 
+# Loop run inside each pool worker: one framed JSON request per line in,
+# one JSON result per line out. Workers stay alive between requests so
+# interpreter startup is paid once per worker, not once per execution.
+# Output is clipped to the size limit inside the worker, so a runaway
+# print loop never ships (or frames) more than MAX_OUTPUT_SIZE + 1 back
+# to the parent; the extra character lets the parent detect truncation.
+_WORKER_SOURCE = f"""
+import contextlib, io, json, sys
+LIMIT = {MAX_OUTPUT_SIZE} + 1
+for line in sys.stdin:
+    try:
+        code = json.loads(line)["code"]
+    except Exception:
+        continue
+    out, err = io.StringIO(), io.StringIO()
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            exec(code, {{"__name__": "__exec__"}})
+    except Exception as e:
+        err.write(str(e))
+    payload = {{"stdout": out.getvalue()[:LIMIT], "stderr": err.getvalue()[:LIMIT]}}
+    sys.stdout.write(json.dumps(payload) + "\\n")
+    sys.stdout.flush()
+"""
+
+
+class CodeExecPool:
+    """Pool of pre-warmed Python worker subprocesses.
+
+    Spawning `python -c` per execution costs tens of milliseconds of
+    fork + interpreter startup; the pool keeps idle workers alive over
+    pipes so steady-state execution is just a pipe round-trip. A worker
+    that times out is killed and replaced, since it may still be running
+    the stuck code.
+    """
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or os.cpu_count() or 2
+        self._idle: "asyncio.Queue" = asyncio.Queue()
+        self._workers: List[Any] = []
+        self._started = False
+        # Strong refs to in-flight respawn tasks (fire-and-forget tasks
+        # are garbage-collectable otherwise)
+        self._respawns: set = set()
+
+    async def _spawn(self):
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", "-c", _WORKER_SOURCE,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            # A full frame is two clipped streams plus JSON overhead;
+            # the default 64KiB StreamReader limit would reject it
+            limit=2 * MAX_OUTPUT_SIZE + 4096,
+        )
+        # Memory limit applied from the parent via prlimit rather than a
+        # preexec_fn, which would force the slow fork path on spawn. The
+        # worker idles on stdin until code arrives, so the limit is in
+        # place before anything untrusted runs. No RLIMIT_CPU: workers
+        # are long-lived and it counts cumulative CPU; wall-clock
+        # timeouts with kill-and-respawn cover runaway code instead.
+        try:
+            resource.prlimit(
+                proc.pid, resource.RLIMIT_AS,
+                (MAX_MEMORY_MB * 1024 * 1024, MAX_MEMORY_MB * 1024 * 1024),
+            )
+        except (AttributeError, OSError):  # pragma: no cover - non-Linux
+            logger.warning("Could not apply memory limit to worker %s", proc.pid)
+        self._workers.append(proc)
+        return proc
+
+    async def _respawn(self) -> None:
+        self._idle.put_nowait(await self._spawn())
+
+    def _discard(self, proc: Any) -> None:
+        """Retire a bad worker and respawn its replacement.
+
+        The respawn runs in the background so the caller isn't also
+        charged for interpreter startup on top of the failure.
+        """
+        if proc.returncode is None:
+            proc.kill()
+        self._workers.remove(proc)
+        task = asyncio.get_event_loop().create_task(self._respawn())
+        self._respawns.add(task)
+        task.add_done_callback(self._respawns.discard)
+
+    async def start(self) -> None:
+        """Pre-warm the workers; called lazily by run() if needed."""
+        if self._started:
+            return
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._spawn())
+        self._started = True
+
+    async def run(self, code: str, timeout: float = MAX_EXECUTION_TIME) -> CodeExecutionResult:
+        """Execute code on an idle worker and return its output."""
+        await self.start()
+        start_time = asyncio.get_event_loop().time()
+
+        proc = await self._idle.get()
+        try:
+            proc.stdin.write(_frame_dumps({"code": code}) + b"\n")
+            await proc.stdin.drain()
+            line = await asyncio.wait_for(proc.stdout.readline(), timeout=timeout)
+        except asyncio.TimeoutError:
+            # The worker may still be running the stuck code
+            self._discard(proc)
+            raise
+
+        # An empty readline means the worker exited mid-request (e.g. the
+        # code raised SystemExit, which the worker's except Exception does
+        # not catch); re-queueing it would poison the pool, so replace it
+        # like the timeout path does. Only a successfully parsed frame
+        # proves the worker is healthy enough to reuse.
+        try:
+            if not line:
+                raise ValueError("worker closed stdout")
+            payload = _frame_loads(line)
+        except ValueError:
+            self._discard(proc)
+            raise RuntimeError("Code execution worker exited unexpectedly")
+
+        self._idle.put_nowait(proc)
+        return CodeExecutionResult(
+            stdout=payload["stdout"],
+            stderr=payload["stderr"],
+            execution_time=asyncio.get_event_loop().time() - start_time,
+        )
+
+    async def close(self) -> None:
+        """Terminate all workers."""
+        for proc in self._workers:
+            if proc.returncode is None:
+                proc.kill()
+        for proc in self._workers:
+            await proc.wait()
+        self._workers = []
+        self._idle = asyncio.Queue()
+        self._started = False
+
+
+class _SecurityVisitor(ast.NodeVisitor):
+    """Targeted visitor for the restricted import/call check.
+
+    Only the three node types that matter get Python-level handlers;
+    everything else descends through generic_visit, which is cheaper
+    than the BFS generator ast.walk drives for every single node.
+    """
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.name in RESTRICTED_IMPORTS:
+                raise ValueError(f"Import of restricted module: {alias.name}")
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        if node.module in RESTRICTED_IMPORTS:
+            raise ValueError(f"Import of restricted module: {node.module}")
+        for alias in node.names:
+            if alias.name in RESTRICTED_IMPORTS:
+                raise ValueError(f"Import of restricted module: {alias.name}")
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id in RESTRICTED_IMPORTS:
+            raise ValueError(f"Call to restricted function: {node.func.id}")
+        self.generic_visit(node)
+
+
+# Memoized security verdicts keyed on a content hash of the code: None
+# for code that passed, the error message for code that was rejected.
+# Bounded LRU so adversarial unique snippets can't grow it without limit.
+_SECURITY_CACHE_SIZE = 1024
+_security_verdicts: "OrderedDict[bytes, Optional[str]]" = OrderedDict()
+
+
+# One pool for the whole process: executor instances are cheap and
+# short-lived (one per convenience call), but the pre-warmed workers
+# behind them should not be
+_EXEC_POOL: Optional[CodeExecPool] = None
+
+
+def _get_exec_pool() -> CodeExecPool:
+    """Get the shared worker pool, creating it on first use."""
+    global _EXEC_POOL
+    if _EXEC_POOL is None:
+        _EXEC_POOL = CodeExecPool()
+    return _EXEC_POOL
+
+
+async def aclose_exec_pool() -> None:
+    """Close the shared pool; call from an app lifespan/shutdown hook."""
+    global _EXEC_POOL
+    if _EXEC_POOL is not None:
+        await _EXEC_POOL.close()
+        _EXEC_POOL = None
+
+
 class PythonCodeExecutor:
     """Secure Python code executor with guardrails."""
-    
-    def __init__(self):
-        self.temp_dir = tempfile.mkdtemp()
         
     async def execute(self, request: CodeExecutionRequest) -> CodeExecutionResponse:
         """Execute Python code with strict security guardrails.
@@ -212,135 +441,71 @@ class PythonCodeExecutor:
             
     def _validate_code_security(self, code: str) -> None:
         """Validate code for security issues.
-        
+
+        Verdicts are memoized per content hash: agents re-run the same
+        snippets constantly, and a cache hit skips the ast.parse and
+        full-tree walk. The cached value is None for clean code or the
+        error message for rejected code.
+
         This is a basic implementation. In production, use more sophisticated
         code analysis tools and sandboxing technologies.
         """
-        # Check for restricted imports
-        import ast
-        
+        key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+        if key in _security_verdicts:
+            _security_verdicts.move_to_end(key)
+            verdict = _security_verdicts[key]
+            if verdict is not None:
+                raise ValueError(verdict)
+            return
+
+        try:
+            self._check_code_security(code)
+        except ValueError as e:
+            _security_verdicts[key] = str(e)
+            if len(_security_verdicts) > _SECURITY_CACHE_SIZE:
+                _security_verdicts.popitem(last=False)
+            raise
+        _security_verdicts[key] = None
+        if len(_security_verdicts) > _SECURITY_CACHE_SIZE:
+            _security_verdicts.popitem(last=False)
+
+    def _check_code_security(self, code: str) -> None:
+        """Uncached AST check behind _validate_code_security."""
         try:
             tree = ast.parse(code)
         except SyntaxError as e:
             raise ValueError(f"Syntax error in code: {str(e)}")
-            
-        for node in ast.walk(tree):
-            # Check for imports
-            if isinstance(node, (ast.Import, ast.ImportFrom)):
-                for alias in node.names:
-                    module_name = alias.name
-                    if module_name in RESTRICTED_IMPORTS:
-                        raise ValueError(f"Import of restricted module: {module_name}")
-                        
-            # Check for dangerous function calls
-            if isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name):
-                    func_name = node.func.id
-                    if func_name in RESTRICTED_IMPORTS:
-                        raise ValueError(f"Call to restricted function: {func_name}")
+
+        _SecurityVisitor().visit(tree)
                         
     async def _execute_sandboxed(self, request: CodeExecutionRequest) -> CodeExecutionResult:
-        """Execute code in a sandboxed environment.
-        
-        This is a simplified sandbox implementation.
-        In production, use proper containerization (Docker) or 
-        specialized sandboxing solutions.
+        """Execute code on a pre-warmed worker from the shared pool.
+
+        The pool replaces the previous spawn-per-execution path: workers
+        already capture stdout/stderr around exec(), so no temp script or
+        sentinel-delimited output parsing is needed, and interpreter
+        startup is paid once per worker instead of per request. A worker
+        that exceeds the timeout is killed and replaced by the pool.
+
+        This is still a simplified sandbox. In production, use proper
+        containerization (Docker) or specialized sandboxing solutions.
         """
-        start_time = asyncio.get_event_loop().time()
-        
-        # Create temporary script file
-        script_path = os.path.join(self.temp_dir, 'script.py')
-        
-        # Wrap code with output capture
-        wrapped_code = f"""
-import sys
-import io
+        result = await _get_exec_pool().run(request.code, timeout=request.timeout)
 
-# Capture stdout and stderr
-old_stdout = sys.stdout
-old_stderr = sys.stderr
-sys.stdout = io.StringIO()
-sys.stderr = io.StringIO()
+        # Limit output size
+        stdout_out = result.stdout
+        stderr_out = result.stderr
+        if len(stdout_out) > MAX_OUTPUT_SIZE:
+            stdout_out = stdout_out[:MAX_OUTPUT_SIZE] + "\n... (truncated)"
+        if len(stderr_out) > MAX_OUTPUT_SIZE:
+            stderr_out = stderr_out[:MAX_OUTPUT_SIZE] + "\n... (truncated)"
+
+        return CodeExecutionResult(
+            stdout=stdout_out,
+            stderr=stderr_out,
+            execution_time=result.execution_time
+        )
 
-result = None
-try:
-    # User code starts here
-{request.code}
-except Exception as e:
-    sys.stderr.write(str(e))
-    
-# Get captured output
-stdout_value = sys.stdout.getvalue()
-stderr_value = sys.stderr.getvalue()
-
-# Restore streams
-sys.stdout = old_stdout
-sys.stderr = old_stderr
-
-# Print results in parseable format
-print("STDOUT_START")
-print(stdout_value, end="")
-print("STDOUT_END")
-print("STDERR_START")
-print(stderr_value, end="")
-print("STDERR_END")
-"""
-        
-        with open(script_path, 'w') as f:
-            f.write(wrapped_code)
-            
-        try:
-            # Execute with subprocess and resource limits
-            process = await asyncio.create_subprocess_exec(
-                sys.executable, script_path,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=self.temp_dir,
-                preexec_fn=self._set_resource_limits
-            )
-            
-            # Wait with timeout
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=request.timeout
-            )
-            
-            execution_time = asyncio.get_event_loop().time() - start_time
-            
-            # Parse output
-            output = stdout.decode('utf-8')
-            
-            # Extract stdout and stderr from wrapped output
-            stdout_out = ""
-            stderr_out = ""
-            
-            if "STDOUT_START" in output and "STDOUT_END" in output:
-                start_idx = output.find("STDOUT_START") + len("STDOUT_START\n")
-                end_idx = output.find("STDOUT_END")
-                stdout_out = output[start_idx:end_idx]
-                
-            if "STDERR_START" in output and "STDERR_END" in output:
-                start_idx = output.find("STDERR_START") + len("STDERR_START\n")
-                end_idx = output.find("STDERR_END")
-                stderr_out = output[start_idx:end_idx]
-                
-            # Limit output size
-            if len(stdout_out) > MAX_OUTPUT_SIZE:
-                stdout_out = stdout_out[:MAX_OUTPUT_SIZE] + "\n... (truncated)"
-            if len(stderr_out) > MAX_OUTPUT_SIZE:
-                stderr_out = stderr_out[:MAX_OUTPUT_SIZE] + "\n... (truncated)"
-                
-            return CodeExecutionResult(
-                stdout=stdout_out,
-                stderr=stderr_out,
-                execution_time=execution_time
-            )
-            
-        finally:
-            # Clean up
-            if os.path.exists(script_path):
-                os.remove(script_path)
-                
     def _set_resource_limits(self):
         """Set resource limits for the subprocess."""
         # Set memory limit
@@ -354,12 +519,6 @@ print("STDERR_END")
             resource.RLIMIT_CPU, 
             (int(MAX_EXECUTION_TIME), int(MAX_EXECUTION_TIME))
         )
-        
-    def __del__(self):
-        # Clean up temp directory
-        import shutil
-        if hasattr(self, 'temp_dir') and os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
 
 
 # Convenience function for direct usage
@@ -374,12 +533,10 @@ async def execute_python_code(code: str, **kwargs) -> CodeExecutionResponse:
         CodeExecutionResponse: Execution results
     """
     request = CodeExecutionRequest(code=code, **kwargs)
-    
-    executor = PythonCodeExecutor()
-    try:
-        return await executor.execute(request)
-    finally:
-        del executor
+
+    # Executors are stateless now (workers live in the shared pool), so
+    # one can be created per call with no cleanup to manage
+    return await PythonCodeExecutor().execute(request)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+"""Embedding cache for repeated ingest/query text.
+
+Wraps any embedding call with a thread-safe LRU cache keyed on the
+SHA-256 of the normalized input text, so re-embedding the same string
+costs a dict lookup instead of a remote round-trip.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration constants for guardrails
+DEFAULT_CAPACITY = 1000
+DEFAULT_TTL = 3600.0  # seconds
+
+
+class LRUEmbeddingCache:
+    """Thread-safe LRU cache for embedding vectors.
+
+    Entries expire after `ttl` seconds and the least recently used entry
+    is evicted once `capacity` is reached. Keys are SHA-256 digests of
+    the stripped, lowercased text, so trivially different spellings of
+    the same query share one entry.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, ttl: float = DEFAULT_TTL):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.sha256(text.strip().lower().encode()).digest()
+
+    def get(self, text: str) -> Optional[Any]:
+        """Return the cached vector for text, or None on miss/expiry."""
+        key = self._key(text)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            vector, stored_at = entry
+            if now - stored_at > self.ttl:
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return vector
+
+    def put(self, text: str, vector: Any) -> None:
+        """Store a vector for text, evicting the LRU entry if full."""
+        key = self._key(text)
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic())
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current hit rate."""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+                "size": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+# Global cache instance shared by ingest and query paths
+_embedding_cache: Optional[LRUEmbeddingCache] = None
+
+
+def get_embedding_cache() -> LRUEmbeddingCache:
+    """Get the shared embedding cache, creating it on first use."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = LRUEmbeddingCache()
+    return _embedding_cache
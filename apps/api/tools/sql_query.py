@@ -3,10 +3,15 @@ Provides SQL query execution functionality with JSON Schema validation,
 Pydantic models, and guardrails for timeout and security limits.
 """
 import asyncio
+import re
 import sqlite3
+import threading
+import time
+
+import orjson
 from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field, validator
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import datetime, timezone
 import logging
 import tempfile
 import os
@@ -20,10 +25,81 @@ MAX_RESULT_ROWS = 1000
 MAX_RESPONSE_SIZE = 5 * 1024 * 1024  # 5MB
 
 # Restricted SQL operations for security
-RESTRICTED_OPERATIONS = {
+RESTRICTED_OPERATIONS = frozenset({
     'DROP', 'DELETE', 'TRUNCATE', 'ALTER', 'CREATE', 'INSERT', 'UPDATE',
     'GRANT', 'REVOKE', 'EXEC', 'EXECUTE', 'CALL'
-}
+})
+
+# First keyword of the statement, skipping leading whitespace and SQL
+# comments; for everything except a WITH prologue the statement type
+# lives in this one token
+_FIRST_KEYWORD_RE = re.compile(
+    r"(?:\s+|--[^\n]*\n?|/\*.*?\*/)*([A-Za-z]+)", re.DOTALL
+)
+
+# Keywords that can start the main statement after a WITH prologue;
+# any other top-level word is part of the CTE list (names, AS,
+# RECURSIVE, MATERIALIZED, ...)
+_STATEMENT_KEYWORDS = frozenset({
+    'SELECT', 'VALUES', 'INSERT', 'REPLACE', 'UPDATE', 'DELETE'
+})
+
+
+def _statement_keyword(sql: str) -> str:
+    """Keyword of the statement that would actually execute.
+
+    Normally the first token, but SQLite allows a CTE prologue in front
+    of DML — `WITH t AS (SELECT 1) DELETE FROM users` executes a DELETE
+    — so a WITH is resolved by scanning to the first statement keyword
+    at parenthesis depth zero (CTE bodies are always parenthesized),
+    skipping comments and string/identifier literals along the way.
+    """
+    match = _FIRST_KEYWORD_RE.match(sql)
+    first = match.group(1).upper() if match else ""
+    if first != 'WITH':
+        return first
+
+    i, n, depth = match.end(), len(sql), 0
+    while i < n:
+        c = sql[i]
+        if c == '(':
+            depth += 1
+            i += 1
+        elif c == ')':
+            depth -= 1
+            i += 1
+        elif c in "'\"`[":
+            # String or quoted identifier; doubled closing quotes escape
+            close = ']' if c == '[' else c
+            i += 1
+            while i < n:
+                if sql[i] == close:
+                    if close != ']' and sql.startswith(close, i + 1):
+                        i += 2
+                        continue
+                    i += 1
+                    break
+                i += 1
+        elif sql.startswith('--', i):
+            nl = sql.find('\n', i)
+            i = n if nl == -1 else nl + 1
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif c.isalpha() or c == '_':
+            j = i + 1
+            while j < n and (sql[j].isalnum() or sql[j] == '_'):
+                j += 1
+            if depth == 0:
+                word = sql[i:j].upper()
+                if word in _STATEMENT_KEYWORDS:
+                    return word
+            i = j
+        else:
+            i += 1
+    # No statement keyword found: the prologue is malformed, and sqlite3
+    # will reject it at execute time
+    return first
 
 # JSON Schema for SQL query tool
 SQL_QUERY_SCHEMA = {
@@ -58,7 +134,9 @@ SQL_QUERY_SCHEMA = {
 
 class SQLQueryRequest(BaseModel):
     """Pydantic model for SQL query requests."""
-    
+
+    model_config = ConfigDict(frozen=True)
+
     query: str = Field(
         ...,
         description="SQL query to execute",
@@ -79,18 +157,23 @@ class SQLQueryRequest(BaseModel):
         description="Execute in read-only mode (SELECT only)"
     )
     
-    @validator('query')
+    @field_validator('query', mode='after')
+    @classmethod
     def validate_query(cls, v):
         if not v.strip():
             raise ValueError("Query cannot be empty")
         
-        query_upper = v.upper().strip()
-        
-        # Check for restricted operations in read-only mode
-        for operation in RESTRICTED_OPERATIONS:
-            if query_upper.startswith(operation) or f" {operation} " in query_upper:
-                raise ValueError(f"Operation '{operation}' not allowed")
-                
+        # The statement type is decided by one keyword, so a set lookup
+        # replaces a per-operation scan over the full uppercased query
+        # (which also false-positived inside string literals). A WITH
+        # prologue is resolved to the keyword that actually executes,
+        # since SQLite allows CTE-prefixed DML; sqlite3's execute()
+        # rejects multi-statement strings, so that keyword is the only
+        # one that can run.
+        first = _statement_keyword(v)
+        if first in RESTRICTED_OPERATIONS:
+            raise ValueError(f"Operation '{first}' not allowed")
+
         return v.strip()
 
 class SQLQueryResult(BaseModel):
@@ -100,9 +183,13 @@ class SQLQueryResult(BaseModel):
         default=[],
         description="Column names"
     )
-    rows: List[List[Any]] = Field(
-        default=[],
-        description="Query result rows"
+    # Rows are kept as a JSON-encoded array: Pydantic would otherwise
+    # deep-validate List[List[Any]] only for the response layer to
+    # re-serialize it — serializing once at fetch time skips both passes
+    # and the intermediate per-cell Python objects
+    rows: bytes = Field(
+        default=b"[]",
+        description="Query result rows as a JSON-encoded array"
     )
     row_count: int = Field(
         default=0,
@@ -133,13 +220,99 @@ class SQLQueryResponse(BaseModel):
         description="Original SQL query"
     )
     timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
+        # Aware UTC clock read; utcnow() is deprecated and returns a
+        # naive datetime that costs extra branches downstream
+        default_factory=lambda: datetime.now(timezone.utc),
         description="Query execution timestamp"
     )
     
+# Demo schema and rows as one script with literals inlined: SQLite
+# parses it in a single pass with no Python-side parameter binding
+_SAMPLE_SQL = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE,
+    age INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE orders (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    product TEXT NOT NULL,
+    amount DECIMAL(10,2),
+    order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+INSERT INTO users (id, name, email, age) VALUES
+    (1, 'Alice Johnson', 'alice@example.com', 28),
+    (2, 'Bob Smith', 'bob@example.com', 35),
+    (3, 'Carol Davis', 'carol@example.com', 42),
+    (4, 'David Wilson', 'david@example.com', 29),
+    (5, 'Eve Brown', 'eve@example.com', 31);
+INSERT INTO orders (id, user_id, product, amount) VALUES
+    (1, 1, 'Laptop', 999.99),
+    (2, 1, 'Mouse', 29.99),
+    (3, 2, 'Keyboard', 79.99),
+    (4, 3, 'Monitor', 299.99),
+    (5, 2, 'Headphones', 149.99),
+    (6, 4, 'Webcam', 89.99),
+    (7, 5, 'Speakers', 199.99);
+"""
+
+
+def _build_sample_data(conn: sqlite3.Connection) -> None:
+    """Create and populate the demo tables on a fresh connection."""
+    conn.executescript(_SAMPLE_SQL)
+    conn.commit()
+
+
+# The sample database is built once at import and kept as a serialized
+# page image; each :memory: request restores it with one bulk page copy
+# (deserialize) instead of re-parsing the DDL and re-inserting every row.
+# When serialize() is unavailable (Python < 3.11), a kept-alive template
+# connection and backup() provide the same page-level copy.
+_template_conn = sqlite3.connect(":memory:", check_same_thread=False)
+_build_sample_data(_template_conn)
+try:
+    _TEMPLATE_BLOB: Optional[bytes] = _template_conn.serialize()
+    _template_conn.close()
+    _template_conn = None
+except AttributeError:  # pragma: no cover - Python < 3.11
+    _TEMPLATE_BLOB = None
+
+
+# One connection per (worker thread, database URL): opening a file DB
+# pays VFS lookups and page-cache warmup, and closing pays an fsync,
+# none of which need repeating per query. Per-thread caching (rather
+# than one shared connection) lets concurrent queries read in parallel
+# instead of serializing on a single connection's mutex; the to_thread
+# executor bounds how many connections can exist.
+_thread_conns = threading.local()
+
+
+def _get_conn(url: str) -> sqlite3.Connection:
+    """Get (or open and cache) this thread's connection for a URL."""
+    cache = getattr(_thread_conns, "by_url", None)
+    if cache is None:
+        cache = _thread_conns.by_url = {}
+    conn = cache.get(url)
+    if conn is None:
+        conn = sqlite3.connect(url)
+        if url == ":memory:":
+            # Fresh in-memory DB: restore the sample dataset once; it
+            # then serves every later :memory: query on this thread
+            if _TEMPLATE_BLOB is not None:
+                conn.deserialize(_TEMPLATE_BLOB)
+            else:  # pragma: no cover - Python < 3.11
+                _template_conn.backup(conn)
+        cache[url] = conn
+    return conn
+
+
 class SQLQueryTool:
     """SQL query tool implementation with guardrails."""
-    
+
     def __init__(self):
         self.temp_db_path = None
         
@@ -194,135 +367,102 @@ class SQLQueryTool:
                 query=request.query
             )
             
+    async def execute_queries(
+        self, requests: List[SQLQueryRequest]
+    ) -> List[SQLQueryResponse]:
+        """Execute independent queries concurrently.
+
+        Each query runs on its own worker thread with that thread's own
+        cached connection, so read-only queries proceed in parallel
+        rather than queueing behind one another. Error handling is
+        per-query via execute_query, so one failure never masks the
+        other results.
+        """
+        return list(await asyncio.gather(
+            *(self.execute_query(r) for r in requests)
+        ))
+
     async def _execute_with_timeout(self, request: SQLQueryRequest) -> SQLQueryResult:
-        """Execute query with timeout protection."""
-        start_time = asyncio.get_event_loop().time()
-        
-        # Use asyncio.wait_for to enforce timeout
+        """Execute query with timeout protection.
+
+        The blocking sqlite3 calls run in a worker thread so the event
+        loop keeps servicing other requests for the whole query; the
+        progress handler installed below aborts SQLite itself at the
+        deadline, since cancelling the awaiting coroutine alone would
+        leave the query running in the thread.
+        """
         try:
             return await asyncio.wait_for(
-                self._execute_query_sync(request),
+                asyncio.to_thread(self._execute_query_blocking, request),
                 timeout=QUERY_TIMEOUT
             )
         except asyncio.TimeoutError:
             raise TimeoutError("Query execution timed out")
-            
-    async def _execute_query_sync(self, request: SQLQueryRequest) -> SQLQueryResult:
-        """Execute SQL query synchronously.
-        
+
+    def _execute_query_blocking(self, request: SQLQueryRequest) -> SQLQueryResult:
+        """Execute SQL query on the calling (worker) thread.
+
         This is a mock implementation using SQLite.
         In production, integrate with actual database drivers.
         """
-        start_time = asyncio.get_event_loop().time()
+        start_time = time.monotonic()
         
-        # Create temporary database with sample data for demonstration
-        if request.database_url == ":memory:":
-            conn = sqlite3.connect(":memory:")
-            await self._setup_sample_data(conn)
-        else:
-            # For file databases, create if not exists
-            conn = sqlite3.connect(request.database_url)
-            
+        # Pooled connection; :memory: comes pre-loaded with the sample
+        # dataset, file databases are created if they don't exist
+        conn = _get_conn(request.database_url)
+
+        # Abort inside SQLite once the deadline passes; a nonzero return
+        # from the progress handler interrupts the running statement
+        deadline = start_time + QUERY_TIMEOUT
+        conn.set_progress_handler(
+            lambda: 1 if time.monotonic() > deadline else 0, 10_000
+        )
+
+        cursor = conn.cursor()
         try:
-            cursor = conn.cursor()
-            
             # Execute query
             cursor.execute(request.query)
             
             # Fetch results
             if cursor.description:
                 columns = [desc[0] for desc in cursor.description]
+                # One C-level copy for the whole result set instead of
+                # arraysize-sized batches
+                cursor.arraysize = request.max_rows
                 rows = cursor.fetchmany(request.max_rows)
-                
-                # Convert to serializable format
-                serializable_rows = []
-                for row in rows:
-                    serializable_row = []
-                    for item in row:
-                        if isinstance(item, (bytes, bytearray)):
-                            serializable_row.append(str(item))
-                        else:
-                            serializable_row.append(item)
-                    serializable_rows.append(serializable_row)
-                    
-                execution_time = asyncio.get_event_loop().time() - start_time
-                
+
+                # Serialize rows straight into the JSON payload;
+                # default=str covers the odd bytes/decimal cell without a
+                # per-cell isinstance pass
+                buf = bytearray(b"[")
+                for i, row in enumerate(rows):
+                    if i:
+                        buf += b","
+                    buf += orjson.dumps(list(row), default=str)
+                buf += b"]"
+
+                execution_time = time.monotonic() - start_time
+
                 return SQLQueryResult(
                     columns=columns,
-                    rows=serializable_rows,
-                    row_count=len(serializable_rows),
+                    rows=bytes(buf),
+                    row_count=len(rows),
                     execution_time=execution_time
                 )
             else:
                 # Non-SELECT query (shouldn't reach here in read-only mode)
-                execution_time = asyncio.get_event_loop().time() - start_time
+                execution_time = time.monotonic() - start_time
                 return SQLQueryResult(
                     columns=[],
-                    rows=[],
+                    rows=b"[]",
                     row_count=0,
                     execution_time=execution_time
                 )
                 
         finally:
-            conn.close()
-            
-    async def _setup_sample_data(self, conn):
-        """Setup sample data for demonstration."""
-        cursor = conn.cursor()
-        
-        # Create sample tables
-        cursor.execute("""
-        CREATE TABLE users (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE,
-            age INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-        
-        cursor.execute("""
-        CREATE TABLE orders (
-            id INTEGER PRIMARY KEY,
-            user_id INTEGER,
-            product TEXT NOT NULL,
-            amount DECIMAL(10,2),
-            order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-        """)
-        
-        # Insert sample data
-        sample_users = [
-            (1, 'Alice Johnson', 'alice@example.com', 28),
-            (2, 'Bob Smith', 'bob@example.com', 35),
-            (3, 'Carol Davis', 'carol@example.com', 42),
-            (4, 'David Wilson', 'david@example.com', 29),
-            (5, 'Eve Brown', 'eve@example.com', 31)
-        ]
-        
-        cursor.executemany(
-            "INSERT INTO users (id, name, email, age) VALUES (?, ?, ?, ?)",
-            sample_users
-        )
-        
-        sample_orders = [
-            (1, 1, 'Laptop', 999.99),
-            (2, 1, 'Mouse', 29.99),
-            (3, 2, 'Keyboard', 79.99),
-            (4, 3, 'Monitor', 299.99),
-            (5, 2, 'Headphones', 149.99),
-            (6, 4, 'Webcam', 89.99),
-            (7, 5, 'Speakers', 199.99)
-        ]
-        
-        cursor.executemany(
-            "INSERT INTO orders (id, user_id, product, amount) VALUES (?, ?, ?, ?)",
-            sample_orders
-        )
-        
-        conn.commit()
-    
+            # The pooled connection stays open; only the cursor goes away
+            cursor.close()
+
     def __del__(self):
         # Clean up temporary database if created
         if self.temp_db_path and os.path.exists(self.temp_db_path):
@@ -362,7 +502,7 @@ if __name__ == "__main__":
             print(f"Columns: {result.result.columns}")
             print(f"Rows returned: {result.result.row_count}")
             print(f"Execution time: {result.result.execution_time:.3f}s")
-            for row in result.result.rows:
+            for row in orjson.loads(result.result.rows):
                 print(f"  {row}")
         else:
             print(f"Error: {result.error}")
@@ -379,7 +519,7 @@ if __name__ == "__main__":
         print(f"\nJoin query success: {result2.success}")
         if result2.success:
             print(f"Rows returned: {result2.result.row_count}")
-            for row in result2.result.rows:
+            for row in orjson.loads(result2.result.rows):
                 print(f"  {row}")
                 
     asyncio.run(test_query())
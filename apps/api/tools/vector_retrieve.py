@@ -2,13 +2,76 @@
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field, validator
+import re
+import string
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+from pydantic import BaseModel, Field, field_validator
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - falls back to brute-force scan
+    faiss = None
+
+from .embedding_cache import get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
+# Semantic answer-cache guardrails: a hit must match the request shape
+# exactly and score at least the similarity floor against a recent query
+SEMANTIC_CACHE_CAPACITY = 128
+SEMANTIC_CACHE_THRESHOLD = 0.95
+SEMANTIC_CACHE_TTL = 7 * 24 * 3600.0  # seconds
+
+# Micro-batching window for query embeddings: concurrent requests that
+# land within the window share one batched model call
+EMBED_MAX_BATCH = 32
+EMBED_BATCH_WINDOW = 0.005  # seconds
+
+# Dimensionality of the built-in mock embedder (OpenAI ada-002); loaded
+# collections must match it or every search would fail in the matmul
+EMBED_DIM = 384
+
+# Above this many rows the in-process index switches from HNSW to an
+# IVF partition: k-means over ~sqrt(N) cells is far cheaper to build
+# than a per-row graph, and each query probes only nprobe cells
+IVF_THRESHOLD = 100_000
+
+# Queries containing these are blocked by the guardrail. Compiled into
+# one case-insensitive alternation so screening is a single scan whose
+# cost stays flat as the blocklist grows, instead of one substring pass
+# per pattern
+HARMFUL_PATTERNS = [
+    'delete', 'drop', 'truncate', 'exec', 'script',
+    'password', 'credential', 'secret', 'token'
+]
+_HARMFUL_PATTERN_RE = re.compile(
+    "|".join(re.escape(p) for p in HARMFUL_PATTERNS), re.IGNORECASE
+)
+
+# Collection-name screening as two C-speed translate passes: deleting
+# every allowed character must leave nothing, and deleting the
+# separators must leave something
+_NON_NAME_CHARS = str.maketrans('', '', string.ascii_letters + string.digits + '_-')
+_NAME_SEPARATORS = str.maketrans('', '', '_-')
+
+def _aligned(shape, dtype, align: int = 64) -> np.ndarray:
+    """Allocate a C-contiguous array starting on an align-byte boundary.
+
+    NumPy's allocator only guarantees 16-byte alignment on some
+    platforms; SIMD kernels (FAISS, BLAS) hit peak throughput on
+    64-byte-aligned loads. Over-allocates a raw byte buffer and views a
+    slice of it, so the returned array keeps the backing buffer alive.
+    """
+    dtype = np.dtype(dtype)
+    size = int(np.prod(shape)) * dtype.itemsize
+    buf = np.empty(size + align, dtype=np.uint8)
+    offset = (-buf.ctypes.data) % align
+    return buf[offset:offset + size].view(dtype).reshape(shape)
+
+
 # JSON Schema for the tool
 VECTOR_RETRIEVE_SCHEMA = {
     "type": "function",
@@ -71,20 +134,22 @@ class VectorRetrieveRequest(BaseModel):
     include_metadata: bool = Field(True, description="Include metadata")
     rerank: bool = Field(False, description="Apply reranking")
     
-    @validator('query')
+    @field_validator('query', mode='after')
+    @classmethod
     def validate_query(cls, v):
-        if not v or not v.strip():
+        if not v.strip():
             raise ValueError("Query cannot be empty")
         if len(v) > 1000:
             raise ValueError("Query too long (max 1000 characters)")
         return v.strip()
-    
-    @validator('collection_name')
+
+    @field_validator('collection_name', mode='after')
+    @classmethod
     def validate_collection_name(cls, v):
-        if not v or not v.strip():
+        if not v.strip():
             raise ValueError("Collection name cannot be empty")
         # Basic name validation
-        if not v.replace('_', '').replace('-', '').isalnum():
+        if v.translate(_NON_NAME_CHARS) or not v.translate(_NAME_SEPARATORS):
             raise ValueError("Collection name must be alphanumeric with underscores/hyphens")
         return v.strip()
 
@@ -94,14 +159,317 @@ class VectorRetrieveResponse(BaseModel):
     total_found: int
     query_time_ms: float
     collection_name: str
-    
+
+
+@dataclass
+class VectorHit:
+    """One retrieval hit, carried between search, filter and rerank.
+
+    Slotted attribute access replaces the string-keyed dict lookups the
+    pipeline used to repeat per item, and halves the per-hit footprint;
+    hits become plain dicts only at the response boundary. Explicit
+    __slots__ rather than dataclass(slots=True) keeps the 3.9 floor,
+    which also rules out field defaults.
+    """
+
+    __slots__ = ('id', 'content', 'score', 'metadata',
+                 'rerank_score', 'original_rank')
+
+    id: str
+    content: str
+    score: float
+    metadata: Optional[Dict[str, Any]]
+    rerank_score: Optional[float]
+    original_rank: Optional[int]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict form for the response payload."""
+        d = {'id': self.id, 'content': self.content, 'score': self.score}
+        if self.metadata is not None:
+            d['metadata'] = self.metadata
+        if self.rerank_score is not None:
+            d['rerank_score'] = self.rerank_score
+            d['original_rank'] = self.original_rank
+        return d
+
+
+
 class VectorRetrieveTool:
     """Vector retrieval tool with guardrails and validation."""
     
-    def __init__(self, vector_store=None, embedding_model=None):
+    def __init__(self, vector_store=None, embedding_model=None, faiss_index=None,
+                 vectors_path=None):
         self.vector_store = vector_store
         self.embedding_model = embedding_model
-        
+        # Optional on-disk .npy (as written by save_collection) memory-
+        # mapped lazily on first search: forked workers then share the
+        # matrix pages through the kernel page cache instead of each
+        # holding a private heap copy
+        self.vectors_path = vectors_path
+        # ANN index over the candidates, built lazily on first search
+        # (or injected); HNSW answers in O(log N) versus the brute-force
+        # scan's O(N·d), which dominates latency past a few 10k vectors
+        self.faiss_index = faiss_index
+        # Candidate vectors stacked into one contiguous (N, d) float16
+        # matrix, built lazily and cached on the instance: cosine scoring
+        # becomes a single matrix-vector product instead of N per-pair
+        # similarity calls, and half-precision storage halves the memory
+        # traffic per scan (plenty of precision for scores in [0, 1]).
+        # The buffer starts on a 64-byte boundary (see _aligned), so
+        # SIMD-backed consumers can assume aligned loads
+        self._matrix_f16: Optional[np.ndarray] = None
+        self._candidate_meta: List[Dict[str, Any]] = []
+        # Semantic answer cache: recent (normalized query vector, request
+        # fingerprint, response, stored_at) entries, so a rephrased query
+        # whose embedding scores above the threshold reuses the stored
+        # response without running retrieval at all
+        self._semantic_entries: List[
+            Tuple[np.ndarray, tuple, "VectorRetrieveResponse", float]
+        ] = []
+        # Embedding micro-batcher, started lazily on the first batched
+        # call so construction stays loop-free
+        self._embed_queue: Optional[asyncio.Queue] = None
+        self._embed_worker: Optional[asyncio.Task] = None
+
+    def load_collection(
+        self, vectors: np.ndarray, metadata: List[Dict[str, Any]]
+    ) -> None:
+        """Load candidate vectors and per-document payloads.
+
+        Vectors are normalized and stored as one C-contiguous matrix;
+        payload dicts live in a parallel list gathered only for the
+        winning indices, so the hot scoring scan never touches them.
+        Replaces any previously loaded (or mock) collection and drops
+        the ANN index and semantic cache built over the old rows.
+        """
+        if len(vectors) != len(metadata):
+            raise ValueError("vectors and metadata must have the same length")
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._check_vector_dim(matrix)
+        matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+        stored = _aligned(matrix.shape, np.float16)
+        np.copyto(stored, matrix)
+        self._matrix_f16 = stored
+        self._candidate_meta = list(metadata)
+        self.faiss_index = None
+        self._semantic_entries.clear()
+
+    def save_collection(self, vectors_path: str) -> None:
+        """Serialize the candidate matrix for memory-mapped loading.
+
+        np.save writes the rows C-contiguously with the data section on
+        a 64-byte boundary, so the mmap'd view keeps the alignment
+        contract of the in-heap matrix.
+        """
+        np.save(vectors_path, self._get_candidate_matrix())
+
+    def _check_vector_dim(self, matrix: np.ndarray) -> None:
+        """Reject a collection the query embedding cannot score.
+
+        A dimensionality mismatch would otherwise surface as an opaque
+        matmul shape error from the hot path on every later search.
+        Only the mock embedder's dimension is knowable up front; an
+        injected embedding_model owns its own dimensionality.
+        """
+        if matrix.ndim != 2:
+            raise ValueError(
+                f"expected a 2-D (N, d) vector matrix, got shape {tuple(matrix.shape)}"
+            )
+        if self.embedding_model is None and matrix.shape[1] != EMBED_DIM:
+            raise ValueError(
+                f"collection dimension {matrix.shape[1]} does not match "
+                f"the embedding dimension {EMBED_DIM}"
+            )
+
+    def _meta_for(self, i: int) -> Dict[str, Any]:
+        """Payload for row i; mmap'd collections carry row ids only."""
+        if i < len(self._candidate_meta):
+            return self._candidate_meta[i]
+        return {"id": f"doc_{i}", "content": ""}
+
+    def _hit_for(self, i: int, score: float) -> VectorHit:
+        """Materialize the hit for row i with the given score."""
+        meta = self._meta_for(i)
+        return VectorHit(
+            id=meta.get('id', f'doc_{i}'),
+            content=meta.get('content', ''),
+            score=score,
+            metadata=meta.get('metadata'),
+            rerank_score=None,
+            original_rank=None,
+        )
+
+    def _get_candidate_matrix(self) -> np.ndarray:
+        """Lazily load or build the candidate matrix.
+
+        A configured vectors_path is memory-mapped read-only — pages
+        fault in on demand and are shared across worker processes.
+        Otherwise the mock matrix is built in heap; rows are
+        L2-normalized at build time so scoring only has to normalize
+        the query, and normalization runs in float32 before the
+        downcast so the quantization error stays in the last step.
+        """
+        if self._matrix_f16 is None and self.vectors_path:
+            mapped = np.load(self.vectors_path, mmap_mode='r')
+            self._check_vector_dim(mapped)
+            self._matrix_f16 = mapped
+        if self._matrix_f16 is None:
+            rng = np.random.default_rng(0)
+            n_candidates = 16
+            matrix = np.ascontiguousarray(
+                rng.random((n_candidates, EMBED_DIM)), dtype=np.float32
+            )
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+            stored = _aligned(matrix.shape, np.float16)
+            np.copyto(stored, matrix)
+            self._matrix_f16 = stored
+            self._candidate_meta = [
+                {
+                    "id": f"doc_{i}",
+                    "content": f"Mock document {i} content related to query",
+                    "metadata": {
+                        "title": f"Document {i}",
+                        "source": f"source_{i}.txt",
+                        "timestamp": "2024-01-01T00:00:00Z"
+                    }
+                }
+                for i in range(n_candidates)
+            ]
+        return self._matrix_f16
+
+    def _get_faiss_index(self) -> "faiss.Index":
+        """Lazily build and cache the ANN index over the candidates.
+
+        Rows are normalized, so inner product is cosine similarity —
+        same layout as the ingestion pipeline's index. Small collections
+        get HNSW; past IVF_THRESHOLD rows the index partitions into
+        ~sqrt(N) k-means cells instead, so a query scores only the
+        centroids plus the vectors in the probed cells.
+        """
+        if self.faiss_index is None:
+            matrix = np.ascontiguousarray(
+                self._get_candidate_matrix(), dtype=np.float32
+            )
+            n, d = matrix.shape
+            if n >= IVF_THRESHOLD:
+                # PQ compresses each vector to 32 one-byte codes, so the
+                # scan over a probed cell is a table-lookup loop over
+                # L1-resident distance LUTs rather than a DRAM-bound
+                # walk of full-width vectors
+                nlist = int(np.sqrt(n))
+                index = faiss.index_factory(
+                    d, f"IVF{nlist},PQ32", faiss.METRIC_INNER_PRODUCT
+                )
+                index.train(matrix)
+            else:
+                index = faiss.IndexHNSWFlat(d, 32, faiss.METRIC_INNER_PRODUCT)
+                index.hnsw.efConstruction = 200
+            index.add(matrix)
+            self.faiss_index = index
+        return self.faiss_index
+
+    def _semantic_lookup(
+        self, query_vec: np.ndarray, fingerprint: tuple
+    ) -> Optional["VectorRetrieveResponse"]:
+        """Return a cached response semantically equivalent to the query.
+
+        Expired entries are pruned lazily here rather than by a
+        background task; the cache is small enough that one list pass
+        per lookup is cheaper than keeping a timer alive.
+        """
+        now = time.monotonic()
+        self._semantic_entries = [
+            e for e in self._semantic_entries
+            if now - e[3] <= SEMANTIC_CACHE_TTL
+        ]
+        candidates = [e for e in self._semantic_entries if e[1] == fingerprint]
+        if not candidates:
+            return None
+        sims = np.stack([e[0] for e in candidates]) @ query_vec
+        best = int(np.argmax(sims))
+        if sims[best] >= SEMANTIC_CACHE_THRESHOLD:
+            return candidates[best][2]
+        return None
+
+    def _semantic_insert(
+        self,
+        query_vec: np.ndarray,
+        fingerprint: tuple,
+        response: "VectorRetrieveResponse",
+    ) -> None:
+        """Remember a response for semantically similar future queries."""
+        self._semantic_entries.append(
+            (query_vec, fingerprint, response, time.monotonic())
+        )
+        if len(self._semantic_entries) > SEMANTIC_CACHE_CAPACITY:
+            self._semantic_entries.pop(0)
+
+    @staticmethod
+    def _normalize_query(query_embedding: np.ndarray) -> np.ndarray:
+        """Unit-length float32 copy of a query embedding."""
+        vec = np.ascontiguousarray(query_embedding, dtype=np.float32)
+        return vec / (np.linalg.norm(vec) or 1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the shared query-embedding cache."""
+        return get_embedding_cache().stats()
+
+    async def _embed_batch_worker(self) -> None:
+        """Drain queued queries into one embed_documents call per window.
+
+        Waits for the first item, then keeps collecting until the batch
+        is full or the window elapses, so a lone request pays at most
+        the window in added latency while concurrent bursts collapse
+        into a single model round-trip.
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self._embed_queue.get()]
+            deadline = loop.time() + EMBED_BATCH_WINDOW
+            while len(batch) < EMBED_MAX_BATCH:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._embed_queue.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            try:
+                embeddings = await self.embedding_model.embed_documents(
+                    [query for query, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+    async def _embed_batched(self, query: str) -> np.ndarray:
+        """Queue a query for the batch worker and await its embedding."""
+        loop = asyncio.get_event_loop()
+        if self._embed_queue is None:
+            self._embed_queue = asyncio.Queue()
+            self._embed_worker = loop.create_task(self._embed_batch_worker())
+        future = loop.create_future()
+        await self._embed_queue.put((query, future))
+        return await future
+
+    async def aclose(self) -> None:
+        """Stop the embedding batch worker; pending futures are cancelled."""
+        if self._embed_worker is not None:
+            self._embed_worker.cancel()
+            try:
+                await self._embed_worker
+            except asyncio.CancelledError:
+                pass
+            self._embed_worker = None
+            self._embed_queue = None
+
     async def _validate_collection_exists(self, collection_name: str) -> bool:
         """Validate that collection exists."""
         try:
@@ -115,13 +483,30 @@ class VectorRetrieveTool:
             return False
     
     async def _get_query_embedding(self, query: str) -> np.ndarray:
-        """Get embedding for the query."""
+        """Get embedding for the query.
+
+        Results go through the shared LRU embedding cache: repeated and
+        trivially respelled queries cost a dict lookup instead of a
+        model round-trip, the dominant latency in this path.
+        """
+        cache = get_embedding_cache()
+        cached = cache.get(query)
+        if cached is not None:
+            return cached
         try:
             if self.embedding_model:
-                return await self.embedding_model.embed_query(query)
+                # Prefer the batched path when the model supports it:
+                # concurrent queries inside one window share a single
+                # embed_documents round-trip
+                if hasattr(self.embedding_model, 'embed_documents'):
+                    embedding = await self._embed_batched(query)
+                else:
+                    embedding = await self.embedding_model.embed_query(query)
             else:
                 # Mock embedding for demo
-                return np.random.rand(384)  # OpenAI ada-002 dimension
+                embedding = np.random.rand(EMBED_DIM)  # OpenAI ada-002 dimension
+            cache.put(query, embedding)
+            return embedding
         except Exception as e:
             logger.error(f"Embedding generation error: {e}")
             raise
@@ -131,57 +516,114 @@ class VectorRetrieveTool:
                              collection_name: str,
                              top_k: int,
                              similarity_threshold: float,
-                             filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+                             filters: Optional[Dict[str, Any]] = None) -> List[VectorHit]:
         """Perform vector similarity search."""
         try:
             if self.vector_store:
-                return await self.vector_store.similarity_search(
+                raw = await self.vector_store.similarity_search(
                     query_embedding=query_embedding,
                     collection_name=collection_name,
                     top_k=top_k,
                     similarity_threshold=similarity_threshold,
                     filters=filters
                 )
+                # External stores hand back dicts; normalize them to
+                # slotted hits at the boundary
+                return [
+                    VectorHit(
+                        id=d.get('id', ''),
+                        content=d.get('content', ''),
+                        score=d.get('score', 0.0),
+                        metadata=d.get('metadata'),
+                        rerank_score=None,
+                        original_rank=None,
+                    )
+                    for d in raw
+                ]
+            elif faiss is not None:
+                # ANN path: a graph descent or cell probe instead of
+                # touching every candidate; the recall knob (efSearch or
+                # nprobe) scales with the threshold since stricter
+                # cutoffs want better recall
+                index = self._get_faiss_index()
+                query = np.ascontiguousarray(
+                    query_embedding, dtype=np.float32
+                ).reshape(1, -1)
+                query /= np.linalg.norm(query) or 1.0
+                if hasattr(index, 'hnsw'):
+                    index.hnsw.efSearch = 64 + int(similarity_threshold * 64)
+                elif hasattr(index, 'nprobe'):
+                    index.nprobe = 1 + int(similarity_threshold * 15)
+
+                k = min(top_k, index.ntotal)
+                scores, ids = index.search(query, k)
+                # Threshold applied as one boolean mask on the score
+                # array; hits are only materialized for surviving rows
+                keep = (ids[0] >= 0) & (scores[0] >= similarity_threshold)
+                return [
+                    self._hit_for(int(i), float(s))
+                    for s, i in zip(scores[0][keep], ids[0][keep])
+                ]
             else:
-                # Mock search results
-                mock_results = []
-                for i in range(min(top_k, 3)):
-                    mock_results.append({
-                        "id": f"doc_{i}",
-                        "content": f"Mock document {i} content related to query",
-                        "score": 0.8 - (i * 0.1),
-                        "metadata": {
-                            "title": f"Document {i}",
-                            "source": f"source_{i}.txt",
-                            "timestamp": "2024-01-01T00:00:00Z"
-                        }
-                    })
-                return mock_results
+                # Brute-force fallback: score every candidate in one
+                # vectorized pass over the cached matrix, then take top_k
+                # with argpartition — O(N) selection instead of a full
+                # O(N log N) sort
+                matrix = self._get_candidate_matrix()
+                query = np.ascontiguousarray(query_embedding, dtype=np.float32)
+                query /= np.linalg.norm(query) or 1.0
+                # Match the query to the half-precision matrix so the
+                # product reads fp16 throughout; scores widen back to
+                # float32 for stable selection
+                query = np.ascontiguousarray(query, dtype=np.float16)
+                scores = (matrix @ query).astype(np.float32)
+
+                # Threshold first, as a boolean mask over the raw score
+                # array: top-k selection runs on the survivors and hits
+                # are only materialized for rows that will be returned
+                keep = np.nonzero(scores >= similarity_threshold)[0]
+                k = min(top_k, keep.size)
+                if k == 0:
+                    return []
+                top = keep[np.argpartition(scores[keep], keep.size - k)[-k:]]
+                top = top[np.argsort(scores[top])[::-1]]
+
+                return [
+                    self._hit_for(int(i), float(scores[i]))
+                    for i in top
+                ]
         except Exception as e:
             logger.error(f"Vector search error: {e}")
             raise
     
-    async def _rerank_results(self, 
-                             query: str, 
-                             results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def _rerank_results(self,
+                             query: str,
+                             results: List[VectorHit]) -> List[VectorHit]:
         """Apply reranking to improve result relevance."""
         try:
             # Simple reranking based on content length and score
-            # In practice, you'd use a reranking model
-            def rerank_score(result):
-                content_length = len(result.get('content', ''))
-                similarity_score = result.get('score', 0)
-                # Prefer balanced content length and high similarity
-                length_factor = min(content_length / 500, 1.0)  # Normalize length
-                return similarity_score * 0.7 + length_factor * 0.3
-            
-            reranked = sorted(results, key=rerank_score, reverse=True)
-            
-            # Update scores to reflect reranking
-            for i, result in enumerate(reranked):
-                result['rerank_score'] = rerank_score(result)
-                result['original_rank'] = results.index(result)
-            
+            # In practice, you'd use a reranking model. Scores and
+            # lengths go into flat arrays so the blend is one vectorized
+            # expression, and argsort hands back original ranks directly
+            # (the old per-item results.index() walk was O(N^2))
+            n = len(results)
+            scores = np.fromiter(
+                (r.score for r in results), dtype=np.float64, count=n
+            )
+            lengths = np.fromiter(
+                (len(r.content) for r in results), dtype=np.float64, count=n
+            )
+            # Prefer balanced content length and high similarity
+            rerank_scores = scores * 0.7 + np.minimum(lengths / 500, 1.0) * 0.3
+            order = np.argsort(rerank_scores)[::-1]
+
+            reranked = []
+            for i in order:
+                result = results[i]
+                result.rerank_score = float(rerank_scores[i])
+                result.original_rank = int(i)
+                reranked.append(result)
+
             return reranked
         except Exception as e:
             logger.error(f"Reranking error: {e}")
@@ -190,44 +632,56 @@ class VectorRetrieveTool:
     def _apply_guardrails(self, request: VectorRetrieveRequest) -> None:
         """Apply safety guardrails."""
         # Rate limiting check (would be implemented with actual rate limiter)
-        
-        # Query content validation
-        query_lower = request.query.lower()
-        
-        # Block potentially harmful queries
-        harmful_patterns = [
-            'delete', 'drop', 'truncate', 'exec', 'script',
-            'password', 'credential', 'secret', 'token'
-        ]
-        
-        for pattern in harmful_patterns:
-            if pattern in query_lower:
-                logger.warning(f"Potentially harmful query blocked: {pattern}")
-                raise ValueError(f"Query contains restricted content: {pattern}")
-        
+
+        # Block potentially harmful queries with one pass of the
+        # compiled blocklist
+        match = _HARMFUL_PATTERN_RE.search(request.query)
+        if match:
+            pattern = match.group(0).lower()
+            logger.warning(f"Potentially harmful query blocked: {pattern}")
+            raise ValueError(f"Query contains restricted content: {pattern}")
+
         # Collection name validation
         if request.collection_name.startswith(('system_', 'admin_', 'internal_')):
             raise ValueError("Access to system collections is restricted")
     
     async def execute(self, **kwargs) -> VectorRetrieveResponse:
         """Execute vector retrieval with validation and guardrails."""
-        import time
-        start_time = time.time()
-        
+        # perf_counter_ns is monotonic (immune to NTP jumps) and cheaper
+        # than a wall-clock read
+        start_ns = time.perf_counter_ns()
+
         try:
             # Validate and parse request
             request = VectorRetrieveRequest(**kwargs)
-            
+
             # Apply guardrails
             self._apply_guardrails(request)
-            
+
             # Validate collection exists
             if not await self._validate_collection_exists(request.collection_name):
                 raise ValueError(f"Collection '{request.collection_name}' does not exist")
-            
+
             # Get query embedding
             query_embedding = await self._get_query_embedding(request.query)
-            
+
+            # Semantic answer cache: a recent query with the same request
+            # shape and a near-identical embedding skips retrieval and
+            # reranking entirely
+            fingerprint = (
+                request.collection_name,
+                request.top_k,
+                request.similarity_threshold,
+                request.include_metadata,
+                request.rerank,
+            )
+            query_vec = self._normalize_query(query_embedding)
+            cached = self._semantic_lookup(query_vec, fingerprint)
+            if cached is not None:
+                query_time_ms = (time.perf_counter_ns() - start_ns) / 1e6
+                logger.info(f"Semantic cache hit in {query_time_ms:.2f}ms")
+                return cached.model_copy(update={"query_time_ms": query_time_ms})
+
             # Perform vector search
             results = await self._search_vectors(
                 query_embedding=query_embedding,
@@ -243,26 +697,29 @@ class VectorRetrieveTool:
             
             # Filter results by similarity threshold
             filtered_results = [
-                result for result in results 
-                if result.get('score', 0) >= request.similarity_threshold
+                hit for hit in results
+                if hit.score >= request.similarity_threshold
             ]
-            
+
             # Remove metadata if not requested
             if not request.include_metadata:
-                for result in filtered_results:
-                    result.pop('metadata', None)
-            
-            query_time_ms = (time.time() - start_time) * 1000
-            
+                for hit in filtered_results:
+                    hit.metadata = None
+
+            query_time_ms = (time.perf_counter_ns() - start_ns) / 1e6
+
             logger.info(f"Vector retrieval completed: {len(filtered_results)} results in {query_time_ms:.2f}ms")
-            
-            return VectorRetrieveResponse(
-                results=filtered_results,
+
+            # Hits leave slotted form only here, at the payload boundary
+            response = VectorRetrieveResponse(
+                results=[hit.to_dict() for hit in filtered_results],
                 total_found=len(filtered_results),
                 query_time_ms=query_time_ms,
                 collection_name=request.collection_name
             )
-            
+            self._semantic_insert(query_vec, fingerprint, response)
+            return response
+
         except ValueError as e:
             logger.error(f"Validation error in vector retrieval: {e}")
             raise